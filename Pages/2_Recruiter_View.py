@@ -1,26 +1,55 @@
+import re
 import streamlit as st
-from utils.text_extraction import extract_text_from_pdf
-from utils.resume_matcher import analyze_resume
+from utils.candidate_index import CandidateIndex
+from utils.reranking import RERANK_BUDGET, RERANK_TOP
+from utils.resume_matcher import embed, match_requisitions, rank_resumes
+from utils.text_extraction import extract_many
 import pandas as pd
 
+@st.cache_resource
+def load_candidate_index():
+    return CandidateIndex()
+
+candidate_index = load_candidate_index()
+
 st.title("🏢 Recruiter View")
 st.write("Upload multiple resumes and one job description to rank best-fit candidates.")
 
 resumes = st.file_uploader("📂 Upload Resumes", type=["pdf"], accept_multiple_files=True)
 job_description = st.text_area("💼 Paste Job Description", height=200)
+add_to_pool = st.checkbox("➕ Add uploaded resumes to the candidate pool", value=True)
+dedupe = st.checkbox(
+    "🧬 Group near-duplicate resumes",
+    value=True,
+    help="Repeated or near-identical submissions are scored once and listed under Near Duplicates.",
+)
+use_rerank = st.checkbox(
+    "🎯 Re-rank top candidates with a cross-encoder",
+    help="Slower but more precise ordering of the best matches. Needs the cross-encoder model available locally.",
+)
+if use_rerank:
+    col1, col2 = st.columns(2)
+    with col1:
+        rerank_top = st.number_input("Candidates to re-rank", min_value=1, max_value=500, value=RERANK_TOP)
+    with col2:
+        rerank_budget = st.number_input("Time budget (seconds)", min_value=1.0, max_value=300.0, value=RERANK_BUDGET)
 
 if st.button("📊 Match Resumes"):
     if not resumes or not job_description.strip():
         st.warning("⚠️ Upload resumes + paste job description.")
     else:
         st.info("Processing resumes …")
-        data = []
-        for file in resumes:
-            text = extract_text_from_pdf(file)
-            score = analyze_resume(text, job_description)
-            data.append({"Resume": file.name, "Match Score (%)": score})
-        df = pd.DataFrame(data).sort_values("Match Score (%)", ascending=False)
+        df = pd.DataFrame(rank_resumes(
+            resumes,
+            job_description,
+            index=candidate_index if add_to_pool else None,
+            rerank_top=int(rerank_top) if use_rerank else 0,
+            rerank_budget=float(rerank_budget) if use_rerank else RERANK_BUDGET,
+            dedupe=dedupe,
+        ))
         st.success("✅ Matching Complete!")
+        if use_rerank and "Rerank Score (%)" in df and df["Rerank Score (%)"].isna().all():
+            st.warning("⚠️ The cross-encoder is unavailable; showing the standard ranking.")
         st.dataframe(df, use_container_width=True)
         st.download_button(
             "⬇️ Download Results (CSV)",
@@ -28,3 +57,102 @@ if st.button("📊 Match Resumes"):
             "resume_match_results.csv",
             "text/csv"
         )
+
+# ============================================================
+# 📋 Match the uploaded resumes against many requisitions at once
+# ============================================================
+st.subheader("📋 Match Against Multiple Requisitions")
+jd_files = st.file_uploader(
+    "📂 Upload Job Descriptions (PDF/DOCX/TXT)", type=["pdf", "docx", "txt"], accept_multiple_files=True
+)
+jd_bulk_text = st.text_area("Or paste job descriptions, separated by a line containing only ---", height=150)
+col1, col2 = st.columns(2)
+with col1:
+    top_jobs = st.number_input("Requisitions per candidate", min_value=1, max_value=100, value=5)
+with col2:
+    top_candidates = st.number_input("Candidates per requisition", min_value=1, max_value=500, value=10)
+
+if st.button("📋 Match All Requisitions"):
+    jd_names, jd_texts = [], []
+    for r in extract_many([f.name for f in jd_files], [f.getvalue() for f in jd_files]) if jd_files else []:
+        if r.ok and r.text.strip():
+            jd_names.append(r.name)
+            jd_texts.append(r.text)
+        else:
+            st.error(f"❌ {r.name}: {r.error or 'No text found'}")
+    pasted = [t.strip() for t in re.split(r"^\s*---\s*$", jd_bulk_text, flags=re.M) if t.strip()]
+    jd_names += [f"Pasted JD {i + 1}" for i in range(len(pasted))]
+    jd_texts += pasted
+
+    if not resumes or not jd_texts:
+        st.warning("⚠️ Upload resumes above and at least one job description.")
+    else:
+        by_candidate, by_requisition, failed = match_requisitions(
+            resumes, jd_texts, jd_names, top_jobs=int(top_jobs), top_candidates=int(top_candidates), dedupe=dedupe
+        )
+        st.success(f"✅ Matched {len(resumes) - len(failed)} resumes against {len(jd_texts)} requisitions.")
+        for error in failed:
+            st.error(f"❌ {error['Resume']}: {error['Error']}")
+        tab1, tab2 = st.tabs(["👤 Best Requisitions per Candidate", "💼 Best Candidates per Requisition"])
+        for tab, rows, file_name in [
+            (tab1, by_candidate, "matches_by_candidate.csv"),
+            (tab2, by_requisition, "matches_by_requisition.csv"),
+        ]:
+            with tab:
+                df = pd.DataFrame(rows)
+                st.dataframe(df, use_container_width=True)
+                st.download_button(
+                    "⬇️ Download (CSV)", df.to_csv(index=False).encode("utf-8"), file_name, "text/csv", key=file_name
+                )
+
+# ============================================================
+# 🔎 Search the stored candidate pool
+# ============================================================
+st.subheader("🔎 Search Candidate Pool")
+st.write(f"{len(candidate_index.records)} candidates indexed.")
+
+col1, col2 = st.columns(2)
+with col1:
+    top_k = st.number_input("Top candidates", min_value=1, max_value=500, value=20)
+with col2:
+    use_partitions = st.checkbox(
+        "⚡ Partitioned (IVF) search",
+        value=candidate_index.centroids is not None,
+        help="Scan only the partitions closest to the job description. Faster on large pools, approximate.",
+    )
+    nprobe = st.number_input("Partitions to scan", min_value=1, max_value=1024, value=8, disabled=not use_partitions)
+    use_quantized = st.checkbox(
+        "🗜️ Compressed (int8) scan",
+        value=candidate_index.quantized,
+        help="Scans about 4× less data (int8 codes), then re-scores the best candidates exactly. The float vectors "
+        "are kept for that, so the index on disk grows by about 25%. Not faster once it is all in memory.",
+    )
+
+if use_partitions and st.button("🧩 Rebuild Partitions"):
+    candidate_index.build_partitions()
+    st.success(f"✅ Built {len(candidate_index.centroids)} partitions.")
+
+if use_quantized and st.button("🗜️ Build Compressed Codes"):
+    candidate_index.build_quantized()
+    st.success(f"✅ Compressed {len(candidate_index.records)} candidates.")
+elif use_quantized and not candidate_index.quantized:
+    st.info("Build the compressed codes to use them; until then the full vectors are searched.")
+
+if st.button("🔎 Search Pool"):
+    if not job_description.strip():
+        st.warning("⚠️ Paste a job description to search with.")
+    elif not candidate_index.records:
+        st.warning("⚠️ The candidate pool is empty. Match some resumes first.")
+    else:
+        hits = candidate_index.search(
+            embed(job_description),
+            k=int(top_k),
+            nprobe=int(nprobe) if use_partitions else None,
+            quantized=use_quantized,
+        )
+        st.dataframe(
+            pd.DataFrame(
+                [{"Resume": r["name"], "Match Score (%)": round(s * 100, 2)} for r, s in hits]
+            ),
+            use_container_width=True,
+        )
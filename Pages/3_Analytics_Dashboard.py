@@ -1,12 +1,9 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-from collections import Counter
-from wordcloud import WordCloud
 import os
-os.environ["CUDA_VISIBLE_DEVICES"] = ""   # ensures CPU mode only
-from sentence_transformers import SentenceTransformer, util
-import re
+from datetime import datetime
+from utils.analytics import analyze, document_stats, load_history, record, summarize, word_cloud
+from utils.metrics import hit_rate, render_prometheus, snapshot
 
 # ------------------------------------------------------------
 # Page Title and Info
@@ -24,74 +21,118 @@ jd_text = st.text_area("💼 Paste the Job Description", height=200)
 
 if st.button("🔍 Analyze Texts"):
     if resume_text.strip() and jd_text.strip():
-        st.info("Processing text and generating analytics...")
-
-        # ------------------------------------------------------------
-        # ✅ Clean and Tokenize Texts
-        # ------------------------------------------------------------
-        def clean_text(t):
-            t = t.lower()
-            t = re.sub(r'[^a-z0-9\s]', '', t)
-            return t.split()
-
-        resume_words = clean_text(resume_text)
-        jd_words = clean_text(jd_text)
-
-        # ------------------------------------------------------------
-        # ✅ Keyword Overlap and Missing Words
-        # ------------------------------------------------------------
-        resume_counter = Counter(resume_words)
-        jd_counter = Counter(jd_words)
-
-        resume_set = set(resume_counter.keys())
-        jd_set = set(jd_counter.keys())
-
-        overlap = resume_set & jd_set
-        missing = jd_set - resume_set
-
-        overlap_pct = round(len(overlap) / len(jd_set) * 100, 2)
-
-        # ------------------------------------------------------------
-        # ✅ Similarity using SentenceTransformer
-        # ------------------------------------------------------------
-        model = SentenceTransformer('all-MiniLM-L6-v2', device='cpu')
-        embeddings = model.encode([resume_text, jd_text], convert_to_tensor=True)
-        sim_score = round(float(util.cos_sim(embeddings[0], embeddings[1])) * 100, 2)
-
-        # ------------------------------------------------------------
-        # ✅ Display Stats
-        # ------------------------------------------------------------
-        st.success(f"🧠 Text Similarity Score: **{sim_score}%**")
-        st.info(f"🔁 Keyword Overlap: **{overlap_pct}%**")
-
-        # ------------------------------------------------------------
-        # ✅ Display Top Missing Keywords
-        # ------------------------------------------------------------
-        if missing:
-            st.subheader("❌ Missing Keywords from Resume")
-            st.write(", ".join(list(missing)[:20]))
-
-        # ------------------------------------------------------------
-        # ✅ Word Cloud Visualization
-        # ------------------------------------------------------------
-        st.subheader("☁️ Resume Word Cloud")
-        resume_wc = WordCloud(width=800, height=400, background_color="white").generate(" ".join(resume_words))
-        plt.imshow(resume_wc, interpolation='bilinear')
-        plt.axis("off")
-        st.pyplot(plt)
-
-        st.subheader("☁️ Job Description Word Cloud")
-        jd_wc = WordCloud(width=800, height=400, background_color="lightgrey").generate(" ".join(jd_words))
-        plt.imshow(jd_wc, interpolation='bilinear')
-        plt.axis("off")
-        st.pyplot(plt)
-
-        # ------------------------------------------------------------
-        # ✅ Frequency Chart
-        # ------------------------------------------------------------
-        st.subheader("📈 Top 20 Resume Keywords (Frequency)")
-        freq_df = pd.DataFrame(resume_counter.most_common(20), columns=["Keyword", "Count"])
-        st.bar_chart(freq_df.set_index("Keyword"))
-
+        # Per-document term/skill counts and embeddings are cached by text hash,
+        # so re-analyzing an unchanged resume or job description is cheap
+        with st.spinner("Processing text and generating analytics..."):
+            analysis = analyze(resume_text, jd_text)
+        record(analysis)
+        st.session_state["dashboard_analysis"] = (analysis, resume_text, jd_text)
     else:
         st.warning("⚠️ Please paste both your Resume and Job Description text to proceed.")
+
+# Kept in session state so toggling the word clouds does not redo the analysis
+if "dashboard_analysis" in st.session_state:
+    analysis, analyzed_resume, analyzed_jd = st.session_state["dashboard_analysis"]
+    resume_stats = document_stats(analyzed_resume)
+    jd_stats = document_stats(analyzed_jd)
+
+    # ------------------------------------------------------------
+    # ✅ Display Stats
+    # ------------------------------------------------------------
+    st.success(f"🧠 Text Similarity Score: **{analysis.similarity}%**")
+    st.info(f"🔁 Skill Overlap: **{analysis.overlap_pct}%**")
+
+    # ------------------------------------------------------------
+    # ✅ Display Top Missing Keywords
+    # ------------------------------------------------------------
+    if analysis.missing:
+        st.subheader("❌ Missing Skills from Resume")
+        st.write(", ".join(analysis.missing[:20]))
+
+    # ------------------------------------------------------------
+    # ✅ Word Cloud Visualization (rendered on demand, off this thread)
+    # ------------------------------------------------------------
+    if st.toggle("☁️ Show word clouds"):
+        resume_cloud = word_cloud(resume_stats, "white")
+        jd_cloud = word_cloud(jd_stats, "lightgrey")
+        with st.spinner("Rendering word clouds..."):
+            st.subheader("☁️ Resume Word Cloud")
+            st.image(resume_cloud.result(), use_column_width=True)
+            st.subheader("☁️ Job Description Word Cloud")
+            st.image(jd_cloud.result(), use_column_width=True)
+
+    # ------------------------------------------------------------
+    # ✅ Frequency Chart
+    # ------------------------------------------------------------
+    st.subheader("📈 Top 20 Resume Skills (Frequency)")
+    freq_df = pd.DataFrame(resume_stats.skills.most_common(20), columns=["Skill", "Count"])
+    st.bar_chart(freq_df.set_index("Skill"))
+
+# ------------------------------------------------------------
+# History: aggregates over every stored analysis
+# ------------------------------------------------------------
+history = load_history()
+summary = summarize(history)
+if summary:
+    st.divider()
+    st.subheader("📚 Analysis History")
+    cols = st.columns(4)
+    cols[0].metric("Analyses", summary["analyses"])
+    cols[1].metric("Distinct resumes", summary["resumes"])
+    cols[2].metric("Mean similarity", f"{summary['mean_similarity']}%")
+    cols[3].metric("Mean skill overlap", f"{summary['mean_overlap']}%")
+
+    trend = pd.DataFrame(
+        {"Similarity (%)": [a.similarity for a in history], "Skill overlap (%)": [a.overlap_pct for a in history]},
+        index=pd.Index([datetime.fromtimestamp(a.timestamp) for a in history], name="Analyzed at"),
+    )
+    st.line_chart(trend)
+
+    if summary["most_missing"]:
+        st.write("**Skills most often missing from resumes**")
+        st.bar_chart(pd.DataFrame(summary["most_missing"], columns=["Skill", "Analyses"]).set_index("Skill"))
+    if summary["most_matched"]:
+        st.write("**Skills most often matched**")
+        st.bar_chart(pd.DataFrame(summary["most_matched"], columns=["Skill", "Analyses"]).set_index("Skill"))
+
+# ------------------------------------------------------------
+# Admin: live pipeline metrics (?admin=1 or RESUME_SCREENER_ADMIN=1)
+# ------------------------------------------------------------
+if st.query_params.get("admin") == "1" or os.environ.get("RESUME_SCREENER_ADMIN") == "1":
+    st.divider()
+    st.subheader("🛠️ Pipeline Metrics")
+    histograms, counters = snapshot()
+
+    if histograms:
+        stages = pd.DataFrame(
+            [
+                {
+                    "Stage": stage,
+                    "Count": h.count,
+                    "Mean (ms)": round(h.sum / h.count * 1000, 2),
+                    "p50 (ms)": round(h.quantile(0.5) * 1000, 2),
+                    "p95 (ms)": round(h.quantile(0.95) * 1000, 2),
+                }
+                for stage, h in sorted(histograms.items())
+            ]
+        )
+        st.dataframe(stages, use_container_width=True)
+
+        stage = st.selectbox("Latency distribution", sorted(histograms))
+        h = histograms[stage]
+        labels = [f"≤{b * 1000:g} ms" for b in h.buckets] + ["> max"]
+        st.bar_chart(pd.DataFrame({"Requests": h.counts}, index=pd.Index(labels, name="Bucket")))
+    else:
+        st.write("No spans recorded yet in this process.")
+
+    cols = st.columns(3)
+    for col, (label, name) in zip(
+        cols,
+        [("Embedding cache", "embedding_cache"), ("Extraction cache", "extraction_cache"), ("Token vocabulary", "token_vocab")],
+    ):
+        rate = hit_rate(name)
+        col.metric(f"{label} hit rate", "–" if rate is None else f"{rate:.0%}")
+
+    if counters:
+        st.dataframe(pd.DataFrame(sorted(counters.items()), columns=["Event", "Total"]), use_container_width=True)
+    st.download_button("⬇️ Download Prometheus metrics", render_prometheus(), "metrics.prom", "text/plain")
@@ -1,6 +1,7 @@
 import streamlit as st
-from utils.text_extraction import get_text
-from utils.cover_letter_gen import generate_cover_letter
+from utils.text_extraction import extract_many, read_upload
+from utils.cover_letter_gen import generate_cover_letter, generate_cover_letters
+
 
 st.title("✉️ AI Cover Letter Generator")
 st.write("Upload or paste your resume and job description to generate a tailored cover letter.")
@@ -14,8 +15,8 @@ jd_file = st.file_uploader("Upload Job Description (PDF/DOCX/TXT)", type=["pdf",
 jd_text_manual = st.text_area("Or Paste Job Description Text Here", height=150)
 
 if st.button("✨ Generate Cover Letter"):
-    resume_text = resume_text_manual or get_text(resume_file)
-    jd_text = jd_text_manual or get_text(jd_file)
+    resume_text = resume_text_manual or read_upload(resume_file, st)
+    jd_text = jd_text_manual or read_upload(jd_file, st)
 
     if not resume_text or not jd_text:
         st.warning("⚠️ Please provide both files.")
@@ -24,3 +25,30 @@ if st.button("✨ Generate Cover Letter"):
         st.success("✅ Cover Letter Generated Successfully!")
         st.text_area("📜 Preview", text, height=350)
         st.download_button("⬇️ Download Cover Letter PDF", pdf_buffer, "cover_letter.pdf", "application/pdf")
+
+# ============================================================
+# 📚 Bulk generation for a cohort against the job description above
+# ============================================================
+st.subheader("📚 Bulk Cover Letters")
+cohort = st.file_uploader(
+    "Upload Resumes for a Cohort (PDF/DOCX/TXT)", type=["pdf", "docx", "txt"], accept_multiple_files=True
+)
+combined = st.radio("Output", ["ZIP of PDFs", "Single combined PDF"], horizontal=True) == "Single combined PDF"
+
+if st.button("📦 Generate All Cover Letters"):
+    jd_text = jd_text_manual or read_upload(jd_file, st)
+    if not cohort or not jd_text:
+        st.warning("⚠️ Upload resumes and provide the job description above.")
+    else:
+        results = extract_many([f.name for f in cohort], [f.getvalue() for f in cohort])
+        readable = [(r.name, r.text) for r in results if r.ok and r.text.strip()]
+        for r in results:
+            if not (r.ok and r.text.strip()):
+                st.error(f"❌ {r.name}: {r.error or 'No text found'}")
+        if readable:
+            texts, data = generate_cover_letters(readable, jd_text, combined=combined)
+            st.success(f"✅ Generated {len(texts)} cover letters.")
+            if combined:
+                st.download_button("⬇️ Download All (PDF)", data, "cover_letters.pdf", "application/pdf")
+            else:
+                st.download_button("⬇️ Download All (ZIP)", data, "cover_letters.zip", "application/zip")
@@ -1,4 +1,7 @@
+import os
 import streamlit as st
+from utils.embedding import warm_up
+from utils.metrics import start_exporters
 
 st.set_page_config(
     page_title="AI Resume Screener",
@@ -6,6 +9,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Load the embedding model in the background so the first page visit is warm
+if os.environ.get("RESUME_SCREENER_WARM_UP", "1") != "0":
+    warm_up()
+
+# Serve /metrics and/or write a metrics file when RESUME_SCREENER_METRICS_* is set
+start_exporters()
+
 st.title("AI Resume Screener")
 st.subheader("Navigate the application")
 
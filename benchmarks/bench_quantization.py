@@ -0,0 +1,72 @@
+"""Benchmark int8 quantized candidate search against the float32 scan: recall, latency and size.
+
+Uses clustered random unit vectors in place of MiniLM embeddings, so no model
+download is needed. Run from the repository root:
+
+    python -m benchmarks.bench_quantization --rows 500000 --queries 16 --k 20
+"""
+import argparse
+import time
+
+import numpy as np
+
+from utils.quantization import quantize, quantized_topk
+from utils.similarity import normalize_rows, topk_blocked
+
+
+def synthetic_embeddings(n, dim, clusters, noise, seed):
+    """Unit vectors scattered around ``clusters`` random centres, loosely like resume embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = normalize_rows(rng.standard_normal((clusters, dim), dtype=np.float32))
+    vectors = centres[rng.integers(0, clusters, n)]
+    vectors += noise * rng.standard_normal((n, dim), dtype=np.float32) / np.sqrt(dim)
+    return normalize_rows(vectors)
+
+
+def recall(found, exact):
+    k = exact.shape[1]
+    return float(np.mean([len(set(f) & set(e)) / k for f, e in zip(found.tolist(), exact.tolist())]))
+
+
+def timed(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=16)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--noise", type=float, default=1.0, help="Spread around cluster centres (higher = harder)")
+    parser.add_argument("--oversample", default="1,2,4,8", help="Comma-separated re-scoring oversample factors")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    vectors = synthetic_embeddings(args.rows, args.dim, args.clusters, args.noise, seed=1)
+    queries = synthetic_embeddings(args.queries, args.dim, args.clusters, args.noise, seed=2)
+    codes, scales = quantize(vectors)
+    print(f"float32 {vectors.nbytes / 2 ** 20:8.1f} MB   int8+scale {(codes.nbytes + scales.nbytes) / 2 ** 20:8.1f} MB   "
+          f"ratio {vectors.nbytes / (codes.nbytes + scales.nbytes):.2f}x")
+
+    (_, exact), t_float = timed(lambda: topk_blocked(queries, vectors, args.k), args.repeat)
+    print(f"{'float32 scan':24} {t_float * 1000:9.1f} ms   recall@{args.k} 1.000")
+
+    (_, found), t = timed(lambda: quantized_topk(queries, codes, scales, args.k), args.repeat)
+    print(f"{'int8 scan':24} {t * 1000:9.1f} ms   recall@{args.k} {recall(found, exact):.3f}   "
+          f"speedup {t_float / t:5.2f}x")
+    for oversample in [int(o) for o in args.oversample.split(",") if o]:
+        (_, found), t = timed(
+            lambda: quantized_topk(queries, codes, scales, args.k, vectors=vectors, oversample=oversample), args.repeat
+        )
+        print(f"{f'int8 + rescore x{oversample}':24} {t * 1000:9.1f} ms   recall@{args.k} {recall(found, exact):.3f}   "
+              f"speedup {t_float / t:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
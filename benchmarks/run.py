@@ -0,0 +1,162 @@
+"""Benchmark suite for the screening hot paths.
+
+    python -m benchmarks.run --output baseline.json
+    python -m benchmarks.run --compare baseline.json      # exit code 1 on regressions
+
+Every case is timed on freshly generated synthetic documents, so document
+level caches start cold (the token vocabulary warms up as it would in
+production). Caches are written to a temporary directory unless --cache-dir
+is given. Requires the embedding model to be available locally or online.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+
+def peak_traced_mb(run, args):
+    """Peak memory allocated through Python and NumPy while ``run(args)`` executes, in MB.
+
+    Measured per call (unlike the process-wide ``ru_maxrss``), in a separate
+    untimed call since tracing slows allocation down. Memory allocated by
+    native libraries outside NumPy (e.g. torch) is not included.
+    """
+    tracemalloc.start()
+    try:
+        run(args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 2 ** 20, 1)
+
+
+def run_case(name, prepare, run, iterations, items=1, warmup=1, seed_base=0):
+    """Time ``run(prepare(seed))`` over ``iterations`` fresh inputs; only ``run`` is timed.
+
+    One more fresh input is then run under tracemalloc for ``peak_traced_mb``.
+    """
+    for w in range(warmup):
+        run(prepare(seed_base - 1 - w))
+    latencies = []
+    for i in range(iterations):
+        args = prepare(seed_base + i)
+        start = time.perf_counter()
+        run(args)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies)
+    peak_mb = peak_traced_mb(run, prepare(seed_base + iterations))
+    return {
+        "name": name,
+        "iterations": iterations,
+        "items_per_iteration": items,
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 3),
+        "mean_ms": round(float(latencies.mean()) * 1000, 3),
+        "throughput_per_s": round(items * iterations / float(latencies.sum()), 2),
+        "peak_traced_mb": peak_mb,
+    }
+
+
+def build_cases(args):
+    # Imported here so RESUME_SCREENER_CACHE_DIR is set before utils reads it
+    from benchmarks.synthetic import NamedBytes, make_jd, make_resume, to_docx, to_pdf
+    from utils import applicant_cover_letter, cover_letter_gen
+    from utils.resume_matcher import calculate_ats_score, compare_keywords_semantic, rank_resumes
+    from utils.text_extraction import get_text
+
+    pair = lambda seed: (make_resume(seed), make_jd(seed))
+    cases = [
+        ("extract_pdf", lambda s: NamedBytes("resume.pdf", to_pdf(make_resume(s))), get_text, 1),
+        ("extract_pdf_cached", lambda s: NamedBytes("resume.pdf", to_pdf(make_resume(0))), get_text, 1),
+        ("extract_docx", lambda s: NamedBytes("resume.docx", to_docx(make_resume(s))), get_text, 1),
+        ("compare_keywords_semantic", pair, lambda a: compare_keywords_semantic(*a), 1),
+        ("calculate_ats_score", pair, lambda a: calculate_ats_score(*a), 1),
+        ("cover_letter_applicant", pair, lambda a: applicant_cover_letter.generate_cover_letter(*a), 1),
+        ("cover_letter_generator", pair, lambda a: cover_letter_gen.generate_cover_letter(*a), 1),
+    ]
+    for n in args.sizes:
+        prepare = lambda s, n=n: (
+            [NamedBytes(f"resume_{s}_{i}.pdf", to_pdf(make_resume(s * 100_000 + i))) for i in range(n)],
+            make_jd(s),
+        )
+        cases.append((f"rank_resumes_{n}", prepare, lambda a: rank_resumes(*a), n))
+    return cases
+
+
+def compare(current, baseline, threshold, min_delta_ms=1.0):
+    """Print p50/p95 ratios against a baseline; return the names of regressed cases."""
+    old = {c["name"]: c for c in baseline["cases"]}
+    regressions = []
+    out = sys.stderr
+    print(f"{'case':30} {'p50 ms':>10} {'base':>10} {'ratio':>7}   {'p95 ms':>10} {'base':>10}", file=out)
+    for case in current["cases"]:
+        base = old.get(case["name"])
+        if base is None:
+            print(f"{case['name']:30} {case['p50_ms']:10.1f} {'-':>10}", file=out)
+            continue
+        ratio = case["p50_ms"] / max(base["p50_ms"], 1e-9)
+        slower = case["p50_ms"] - base["p50_ms"] > min_delta_ms
+        flag = "  REGRESSION" if ratio > 1 + threshold and slower else ""
+        if flag:
+            regressions.append(case["name"])
+        print(f"{case['name']:30} {case['p50_ms']:10.1f} {base['p50_ms']:10.1f} {ratio:7.2f}   "
+              f"{case['p95_ms']:10.1f} {base['p95_ms']:10.1f}{flag}", file=out)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark extraction, encoding, matching and PDF rendering.")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--ranking-iterations", type=int, default=3, help="Iterations for rank_resumes cases")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated recruiter ranking pool sizes")
+    parser.add_argument("--only", help="Run only cases whose name contains this string")
+    parser.add_argument("--cache-dir", help="Cache directory (default: a fresh temporary directory)")
+    parser.add_argument("--output", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p50 slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore p50 slowdowns smaller than this")
+    args = parser.parse_args(argv)
+    args.sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    os.environ["RESUME_SCREENER_CACHE_DIR"] = args.cache_dir or tempfile.mkdtemp(prefix="resume_bench_")
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "cases": [],
+    }
+    for offset, (name, prepare, run, items) in enumerate(build_cases(args)):
+        if args.only and args.only not in name:
+            continue
+        iterations = args.ranking_iterations if name.startswith("rank_resumes") else args.iterations
+        case = run_case(name, prepare, run, iterations, items=items, seed_base=(offset + 1) * 1000)
+        results["cases"].append(case)
+        print(f"{name:30} p50 {case['p50_ms']:9.1f} ms  p95 {case['p95_ms']:9.1f} ms  "
+              f"{case['throughput_per_s']:9.1f}/s  peak {case['peak_traced_mb']} MB", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
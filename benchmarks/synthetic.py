@@ -0,0 +1,85 @@
+"""Deterministic synthetic resumes, job descriptions and their PDF/DOCX renderings."""
+import io
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+from fpdf import FPDF
+
+from utils.token_vocab import DEFAULT_LEXICON, read_lexicon
+
+FILLER = (
+    "led built designed delivered improved managed analyzed developed automated "
+    "reduced increased collaborated partnered migrated maintained reported "
+    "team project pipeline customers stakeholders quarterly revenue platform "
+    "process dashboard model data system results service quality cost"
+).split()
+
+
+def _skills():
+    try:
+        return read_lexicon(DEFAULT_LEXICON)
+    except OSError:
+        return ["python", "sql", "excel", "tableau", "machine learning", "aws"]
+
+
+def make_resume(seed, words=450):
+    rng = random.Random(seed)
+    skills = _skills()
+    lines = [f"Candidate {seed}", f"candidate{seed}@example.com", ""]
+    while sum(len(l.split()) for l in lines) < words:
+        picked = rng.sample(skills, 3)
+        lines.append(
+            " ".join(rng.choices(FILLER, k=10)) + f" using {picked[0]}, {picked[1]} and {picked[2]}."
+        )
+    return "\n".join(lines)
+
+
+def make_jd(seed, words=250):
+    rng = random.Random(10_000 + seed)
+    skills = _skills()
+    lines = ["Role: Data Analyst", "", "Requirements:"]
+    while sum(len(l.split()) for l in lines) < words:
+        lines.append(f"Experience with {rng.choice(skills)} and {rng.choice(skills)}; " + " ".join(rng.choices(FILLER, k=6)))
+    return "\n".join(lines)
+
+
+def to_pdf(text):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=10)
+    pdf.multi_cell(190, 5, text.encode("latin-1", "replace").decode("latin-1"))
+    return bytes(pdf.output())
+
+
+def to_docx(text):
+    """Minimal single-part DOCX, enough for docx2txt."""
+    paragraphs = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' for line in text.split("\n")
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{paragraphs}</w:body></w:document>"
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            "</Types>",
+        )
+        z.writestr("word/document.xml", document)
+    return buffer.getvalue()
+
+
+class NamedBytes(io.BytesIO):
+    """In-memory file with a ``name``, like a Streamlit UploadedFile."""
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
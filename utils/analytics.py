@@ -0,0 +1,218 @@
+"""Cached aggregates, deferred word clouds and stored history for the Analytics Dashboard.
+
+Per-document aggregates (term and skill frequencies) are computed once per
+document hash and reused across reruns; chunk embeddings are already
+memoized by ``chunked_scoring``. Word clouds are drawn from those term
+frequencies on a small background thread pool, only when requested, and
+the PNGs are cached by document hash. Every new analysis is appended to a
+history file (scores and skill lists only, no document text) so the
+dashboard can show aggregates across recent analyses; the file is capped
+at ``HISTORY_MAX_BYTES`` and only its tail is read.
+"""
+import dataclasses
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.chunked_scoring import chunked_similarity
+from utils.embedding_cache import DEFAULT_CACHE_DIR
+from utils.metrics import span
+from utils.skills import get_skill_matcher
+from utils.tokenization import tokenize
+
+HISTORY_PATH = os.environ.get(
+    "RESUME_SCREENER_ANALYTICS_HISTORY", os.path.join(DEFAULT_CACHE_DIR, "analytics_history.jsonl")
+)
+HISTORY_MAX_BYTES = 4 * 1024 * 1024
+HISTORY_LIMIT = 1000
+MAX_CACHED = 128
+CLOUD_TERMS = 200
+
+_lock = threading.Lock()
+_stats = OrderedDict()
+_clouds = OrderedDict()
+_renderer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="wordcloud")
+
+
+def document_key(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _remember(cache, key, value):
+    with _lock:
+        cache[key] = value
+        while len(cache) > MAX_CACHED:
+            cache.popitem(last=False)
+
+
+def _recall(cache, key):
+    with _lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+@dataclasses.dataclass
+class DocumentStats:
+    """Aggregates of one document: word count, top terms and skill mentions."""
+
+    key: str
+    words: int
+    terms: dict
+    skills: Counter
+
+
+def document_stats(text):
+    """DocumentStats for ``text``, memoized by a hash of the text."""
+    key = document_key(text)
+    stats = _recall(_stats, key)
+    if stats is None:
+        doc = tokenize(text)
+        keywords = set(doc.keywords())
+        stats = DocumentStats(
+            key=key,
+            words=len(doc),
+            terms=dict([(t, c) for t, c in doc.most_common() if t in keywords][:CLOUD_TERMS]),
+            skills=get_skill_matcher().count(doc),
+        )
+        _remember(_stats, key, stats)
+    return stats
+
+
+@dataclasses.dataclass
+class Analysis:
+    """One resume-vs-job-description comparison, as stored in the history."""
+
+    resume_key: str
+    jd_key: str
+    similarity: float
+    overlap_pct: float
+    matched: list
+    missing: list
+    timestamp: float = dataclasses.field(default_factory=time.time)
+
+
+def analyze(resume_text, jd_text):
+    """Compare a resume with a job description using the cached aggregates of both."""
+    with span("dashboard_analysis"):
+        resume, jd = document_stats(resume_text), document_stats(jd_text)
+        matched = [s for s in jd.skills if s in resume.skills]
+        missing = [s for s in jd.skills if s not in resume.skills]
+        return Analysis(
+            resume_key=resume.key,
+            jd_key=jd.key,
+            similarity=round(chunked_similarity(resume_text, jd_text) * 100, 2),
+            overlap_pct=round(len(matched) / len(jd.skills) * 100, 2) if jd.skills else 0.0,
+            matched=matched,
+            missing=missing,
+        )
+
+
+def _render_cloud(terms, background):
+    from wordcloud import WordCloud
+
+    with span("wordcloud_render"):
+        image = WordCloud(width=800, height=400, background_color=background).generate_from_frequencies(terms).to_image()
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+
+def word_cloud(stats, background="white"):
+    """Future resolving to PNG bytes of ``stats``' word cloud, rendered off the calling thread.
+
+    Results are cached by document hash and background, so reruns return an
+    already completed future; failed renders are retried.
+    """
+    key = (stats.key, background)
+    future = _recall(_clouds, key)
+    if future is None or (future.done() and future.exception() is not None):
+        future = _renderer.submit(_render_cloud, stats.terms or {"(empty)": 1}, background)
+        _remember(_clouds, key, future)
+    return future
+
+
+def _tail(path, limit, chunk_size=65536):
+    """The last ``limit`` lines of ``path``, read backwards from the end in chunks."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= limit:
+            step = min(chunk_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.splitlines()
+    if position > 0:
+        lines = lines[1:]  # the first line may start mid-record
+    return [line.decode("utf-8", "replace") for line in lines[-limit:]]
+
+
+def record(analysis, path=HISTORY_PATH):
+    """Append ``analysis`` to the history file unless it repeats the last entry.
+
+    Returns True if it was written. Once the file passes
+    ``HISTORY_MAX_BYTES`` it is rewritten with its newer half.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _lock:
+        try:
+            last = _tail(path, 1)
+        except OSError:
+            last = []
+        if last:
+            try:
+                previous = json.loads(last[0])
+                if (previous["resume_key"], previous["jd_key"]) == (analysis.resume_key, analysis.jd_key):
+                    return False
+            except (ValueError, KeyError, TypeError):
+                pass
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(dataclasses.asdict(analysis)) + "\n")
+            size = f.tell()
+        if size > HISTORY_MAX_BYTES:
+            with open(path, "rb") as f:
+                f.seek(size - HISTORY_MAX_BYTES // 2)
+                newer = f.read()
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(newer[newer.find(b"\n") + 1:])
+            os.replace(tmp_path, path)
+    return True
+
+
+def load_history(path=HISTORY_PATH, limit=HISTORY_LIMIT):
+    """The most recent ``limit`` stored analyses, oldest first."""
+    try:
+        lines = _tail(path, limit)
+    except OSError:
+        return []
+    history = []
+    for line in lines:
+        try:
+            history.append(Analysis(**json.loads(line)))
+        except (ValueError, TypeError):
+            continue
+    return history
+
+
+def summarize(history, top=15):
+    """Aggregate statistics over stored analyses."""
+    if not history:
+        return None
+    return {
+        "analyses": len(history),
+        "resumes": len({a.resume_key for a in history}),
+        "job_descriptions": len({a.jd_key for a in history}),
+        "mean_similarity": round(sum(a.similarity for a in history) / len(history), 2),
+        "mean_overlap": round(sum(a.overlap_pct for a in history) / len(history), 2),
+        "most_missing": Counter(s for a in history for s in a.missing).most_common(top),
+        "most_matched": Counter(s for a in history for s in a.matched).most_common(top),
+    }
@@ -0,0 +1,65 @@
+"""Short cover letter used by the Applicant View (see cover_letter_gen for the long form)."""
+import io
+import re
+
+from utils.embedding import DEFAULT_MODEL_NAME, encode_tokens
+from utils.pdf_render import COMPACT, render_letter
+from utils.token_matcher import match_tokens
+from utils.tokenization import tokenize
+
+
+def extract_job_title(jd_text: str) -> str:
+    if not jd_text or not isinstance(jd_text, str):
+        return "the advertised position"
+
+    patterns = [
+        r"(?:title|position|role)\s*[:\-]\s*([A-Za-z0-9\s/&]+)",
+        r"\b(?:for|as)\s+a[n]?\s+([A-Z][A-Za-z\s/&]+)",
+        r"([A-Z][A-Za-z\s/&]+)\s*(?:position|role|opportunity)",
+    ]
+
+    for pat in patterns:
+        match = re.search(pat, jd_text, re.IGNORECASE)
+        if match:
+            title = re.sub(r"[^A-Za-z0-9\s/&-]", "", match.group(1).strip())
+            return title[:60]
+
+    for line in jd_text.split("\n"):
+        if any(w in line.lower() for w in ["engineer", "analyst", "scientist", "developer", "manager", "intern", "specialist"]):
+            return line.strip().split(":")[0]
+
+    return "the advertised position"
+
+
+def generate_cover_letter(resume_text: str, jd_text: str, model_name: str = DEFAULT_MODEL_NAME):
+    """Generate a clean and human-like cover letter."""
+    if not resume_text or not jd_text:
+        return "Please provide both resume and job description text.", None
+
+    resume_tokens = tokenize(resume_text).unique_tokens()
+    jd_tokens = tokenize(jd_text).unique_tokens()
+
+    if not resume_tokens or not jd_tokens:
+        return "Insufficient text to analyze.", None
+
+    matched, missing = match_tokens(
+        jd_tokens, resume_tokens, lambda tokens: encode_tokens(tokens, model_name), threshold=0.65
+    )
+
+    matched_text = ", ".join(sorted(matched[:12])) or "key analytical and technical skills"
+    missing_text = ", ".join(sorted(missing[:8])) or "emerging technologies and methodologies"
+
+    job_title = extract_job_title(jd_text)
+
+    text = (
+        f"Dear Hiring Manager,\n\n"
+        f"I am excited to apply for {job_title}. My experience and skills align closely with the requirements outlined in the job description.\n\n"
+        f"I bring proven strengths in {matched_text}, which I have applied to deliver measurable results and drive process improvements. "
+        f"I am eager to continue developing expertise in {missing_text} to contribute meaningfully to your organization's goals.\n\n"
+        f"I am confident that my problem-solving mindset, adaptability, and technical foundation make me a strong fit for this role.\n\n"
+        f"Thank you for considering my application. I look forward to the opportunity to discuss how I can add value to your team.\n\n"
+        f"Sincerely,\nAnitha Morampudi"
+    )
+
+    pdf_buffer = io.BytesIO(render_letter(text, COMPACT))
+    return text, pdf_buffer
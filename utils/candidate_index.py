@@ -0,0 +1,272 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from utils.embedding_cache import DEFAULT_CACHE_DIR
+from utils.quantization import quantize, quantized_topk
+from utils.similarity import normalize_rows, topk_blocked
+
+DEFAULT_INDEX_DIR = os.path.join(DEFAULT_CACHE_DIR, "candidate_index")
+
+
+class CandidateIndex:
+    """Persistent, append-only index of candidate resume embeddings.
+
+    Layout inside ``directory``:
+      meta.json        model name and embedding dimension
+      vectors.f32      row-major float32 unit vectors, appended in place
+      records.jsonl    one {"id", "name"} line per row
+      centroids.npy    optional IVF partition centroids
+      assignments.i32  partition id of every row (kept in step with vectors)
+      codes.i8         optional int8 codes of every row, for compressed scans
+      scales.f32       per-row scales of the int8 codes
+    """
+
+    def __init__(self, directory=DEFAULT_INDEX_DIR, model_name="all-MiniLM-L6-v2"):
+        self.directory = directory
+        self.model_name = model_name
+        self.dim = None
+        self.records = []
+        self._ids = {}
+        self._vectors = None
+        self._assignments = None
+        self.centroids = None
+        self.quantized = False
+        self._codes = None
+        self._scales = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # Files holding one entry per stored row, appended to by ``add``
+    _ROW_FILES = ("vectors.f32", "assignments.i32", "codes.i8", "scales.f32", "records.jsonl")
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        try:
+            with open(self._path("meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        if meta.get("model") != self.model_name:
+            raise ValueError(
+                f"Index at {self.directory} was built with {meta.get('model')}, not {self.model_name}"
+            )
+        self.dim = meta["dim"]
+        if os.path.exists(self._path("records.jsonl")):
+            self.records = self._read_records()
+        # Roll back a partially written trailing add, if any
+        n = min(len(self.records), len(self))
+        self.records = self.records[:n]
+        if os.path.exists(self._path("vectors.f32")):
+            os.truncate(self._path("vectors.f32"), n * 4 * self.dim)
+        self._ids = {r["id"]: i for i, r in enumerate(self.records)}
+        if os.path.exists(self._path("centroids.npy")):
+            self.centroids = np.load(self._path("centroids.npy"))
+            # Missing or short (crash between writing the centroids and the assignments): recompute
+            if self._file_size("assignments.i32") < n * 4:
+                assignments = self._assign(self.vectors)
+            else:
+                assignments = np.fromfile(self._path("assignments.i32"), dtype=np.int32)
+            assignments[:n].tofile(self._path("assignments.i32"))
+        if os.path.exists(self._path("codes.i8")):
+            self.quantized = True
+            written = min(self._file_size("codes.i8") // self.dim, self._file_size("scales.f32") // 4)
+            if written < n:
+                self._write_codes(self.vectors)
+            os.truncate(self._path("codes.i8"), n * self.dim)
+            os.truncate(self._path("scales.f32"), n * 4)
+
+    def _file_size(self, name):
+        path = self._path(name)
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def __len__(self):
+        if self.dim is None or not os.path.exists(self._path("vectors.f32")):
+            return 0
+        return os.path.getsize(self._path("vectors.f32")) // (4 * self.dim)
+
+    def __contains__(self, candidate_id):
+        return candidate_id in self._ids
+
+    @property
+    def vectors(self):
+        """Memory-mapped (n, dim) view of all stored vectors."""
+        if self._vectors is None or self._vectors.shape[0] != len(self.records):
+            if not self.records:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            self._vectors = np.memmap(
+                self._path("vectors.f32"), dtype=np.float32, mode="r",
+                shape=(len(self.records), self.dim),
+            )
+        return self._vectors
+
+    @property
+    def assignments(self):
+        if self.centroids is None:
+            return None
+        if self._assignments is None or self._assignments.shape[0] != len(self.records):
+            self._assignments = np.fromfile(self._path("assignments.i32"), dtype=np.int32)[:len(self.records)]
+        return self._assignments
+
+    @property
+    def codes(self):
+        """Memory-mapped (n, dim) int8 codes and (n,) scales, or None if not built."""
+        if not self.quantized:
+            return None
+        if self._codes is None or self._codes.shape[0] != len(self.records):
+            n = len(self.records)
+            self._codes = np.memmap(self._path("codes.i8"), dtype=np.int8, mode="r", shape=(n, self.dim))
+            self._scales = np.fromfile(self._path("scales.f32"), dtype=np.float32)[:n]
+        return self._codes, self._scales
+
+    def _read_records(self):
+        """Records up to the first torn line (a crash mid-``add``), which is cut from the file."""
+        records = []
+        valid = 0
+        with open(self._path("records.jsonl"), "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line) if line.strip() else None
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                if record is not None:
+                    records.append(record)
+                valid += len(line)
+        if valid < self._file_size("records.jsonl"):
+            os.truncate(self._path("records.jsonl"), valid)
+        return records
+
+    def add(self, ids, embeddings, names=None):
+        """Append embeddings for candidates not already in the index.
+
+        Returns the number of rows actually added.
+        """
+        embeddings = normalize_rows(np.atleast_2d(embeddings))
+        names = names or ids
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(embeddings.shape[1])
+                with open(self._path("meta.json"), "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+            elif embeddings.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-d embeddings, got {embeddings.shape[1]}-d")
+
+            keep = {}
+            for row, candidate_id in enumerate(ids):
+                if candidate_id not in self._ids and candidate_id not in keep:
+                    keep[candidate_id] = row
+            keep = list(keep.values())
+            if not keep:
+                return 0
+
+            new = np.ascontiguousarray(embeddings[keep])
+            records = [{"id": ids[row], "name": names[row]} for row in keep]
+            sizes = {name: self._file_size(name) for name in self._ROW_FILES}
+            try:
+                with open(self._path("vectors.f32"), "ab") as f:
+                    f.write(new.tobytes())
+                if self.centroids is not None:
+                    with open(self._path("assignments.i32"), "ab") as f:
+                        f.write(self._assign(new).tobytes())
+                if self.quantized:
+                    codes, scales = quantize(new)
+                    with open(self._path("codes.i8"), "ab") as f:
+                        f.write(codes.tobytes())
+                    with open(self._path("scales.f32"), "ab") as f:
+                        f.write(scales.tobytes())
+                with open(self._path("records.jsonl"), "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(record) + "\n" for record in records))
+            except OSError:
+                # e.g. a full disk: cut every file back so later adds stay row-aligned
+                for name, size in sizes.items():
+                    if os.path.exists(self._path(name)):
+                        os.truncate(self._path(name), size)
+                raise
+            # Only now are the rows committed; a failed write leaves the ids addable again
+            for record in records:
+                self._ids[record["id"]] = len(self.records)
+                self.records.append(record)
+            return len(keep)
+
+    def _assign(self, vectors, block_size=65536):
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), block_size):
+            block = np.asarray(vectors[start:start + block_size], dtype=np.float32)
+            out[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        return out
+
+    def _write_codes(self, vectors, block_size=65536):
+        with open(self._path("codes.i8"), "wb") as codes_file, open(self._path("scales.f32"), "wb") as scales_file:
+            for start in range(0, len(vectors), block_size):
+                codes, scales = quantize(vectors[start:start + block_size])
+                codes_file.write(codes.tobytes())
+                scales_file.write(scales.tobytes())
+
+    def build_quantized(self):
+        """Write int8 codes of every row; later adds keep them in step and ``search`` can scan them.
+
+        The codes are a quarter of the size of ``vectors.f32``, which is kept
+        for exact re-scoring, so they add about 25% to the index on disk.
+        """
+        with self._lock:
+            self._write_codes(self.vectors)
+            self.quantized = True
+            self._codes = None
+
+    def build_partitions(self, n_lists=None, iterations=10, sample_size=50000, seed=0):
+        """Cluster the index into ``n_lists`` partitions (spherical k-means) for IVF search."""
+        n = len(self.records)
+        if n == 0:
+            return
+        n_lists = min(n_lists or max(1, int(np.sqrt(n))), n)
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(n, size=min(sample_size, n), replace=False))
+        sample = np.asarray(self.vectors[sample_rows], dtype=np.float32)
+
+        n_lists = min(n_lists, len(sample))
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = normalize_rows(sums)
+
+        with self._lock:
+            self.centroids = centroids
+            np.save(self._path("centroids.npy"), centroids)
+            self._assign(self.vectors).tofile(self._path("assignments.i32"))
+            self._assignments = None
+
+    def search(self, query, k=10, nprobe=None, block_size=65536, quantized=False):
+        """Return the top-k records for a query embedding as (record, score) pairs.
+
+        With partitions built and ``nprobe`` set, only the ``nprobe`` partitions
+        closest to the query are scanned; otherwise the whole index is scanned.
+        With ``quantized`` and codes built by ``build_quantized``, the int8
+        codes are scanned instead of the float vectors and only the best few
+        candidates are re-scored in float; without codes the float vectors
+        are scanned.
+        """
+        if not self.records:
+            return []
+        query = normalize_rows(np.atleast_2d(query))
+        row_ids = None
+        if nprobe and self.centroids is not None:
+            nprobe = min(nprobe, len(self.centroids))
+            probes = np.argsort(-(query @ self.centroids.T)[0])[:nprobe]
+            row_ids = np.flatnonzero(np.isin(self.assignments, probes))
+        if quantized and self.quantized:
+            codes, scales = self.codes
+            scores, idx = quantized_topk(query, codes, scales, k, vectors=self.vectors, row_ids=row_ids)
+        else:
+            scores, idx = topk_blocked(query, self.vectors, k, block_size=block_size, row_ids=row_ids)
+        return [(self.records[i], float(s)) for i, s in zip(idx[0], scores[0])]
@@ -0,0 +1,102 @@
+"""Compact candidate records and a streaming upload path for large resume batches.
+
+A recruiter upload of a thousand resumes used to be held as raw bytes,
+decoded text and result rows all at once. ``iter_candidate_records`` reads,
+extracts and embeds ``batch_size`` files at a time and keeps only a small
+``CandidateRecord`` per file, so peak memory is bounded by the batch size
+(plus the uploads Streamlit itself holds), not by the number of files.
+"""
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.dedup import DuplicateIndex
+from utils.embedding import DEFAULT_MODEL_NAME, encode
+from utils.metrics import count
+from utils.text_extraction import extract_many, read_bytes
+
+BATCH_SIZE = 64
+
+
+class CandidateRecord:
+    """One uploaded resume after extraction and embedding; no text or file bytes are kept.
+
+    ``file_id`` is the file's position in the upload, ``sha256`` its content
+    hash, ``embedding`` a float32 vector (None when the file could not be
+    read, with ``error`` set) and ``score`` is filled in by the caller.
+    Near-duplicates of an earlier upload are not embedded; ``duplicate_of``
+    holds the ``file_id`` of their cluster's representative instead.
+    """
+
+    __slots__ = ("file_id", "name", "sha256", "embedding", "score", "error", "duplicate_of")
+
+    def __init__(self, file_id, name, sha256, embedding=None, score=None, error=None, duplicate_of=None):
+        self.file_id = file_id
+        self.name = name
+        self.sha256 = sha256
+        self.embedding = embedding
+        self.score = score
+        self.error = error
+        self.duplicate_of = duplicate_of
+
+    @property
+    def ok(self):
+        return self.embedding is not None
+
+    def __repr__(self):
+        return f"CandidateRecord({self.file_id}, {self.name!r}, score={self.score}, error={self.error!r})"
+
+
+def iter_candidate_records(files, batch_size=BATCH_SIZE, max_workers=None, model_name=DEFAULT_MODEL_NAME,
+                           dedupe=False):
+    """Yield a CandidateRecord per file, in order, ``batch_size`` files at a time.
+
+    Each batch is read, extracted (in one process pool shared by all
+    batches), embedded through the embedding cache and then released before
+    the next batch is read. With ``dedupe`` the extracted texts are first
+    clustered by a DuplicateIndex and only one representative per cluster
+    is embedded.
+    """
+    files = list(files)
+    duplicates = DuplicateIndex() if dedupe else None
+    pool = None
+    if len(files) > 1:
+        pool = ProcessPoolExecutor(max_workers=max_workers or min(len(files), os.cpu_count() or 1))
+    try:
+        for start in range(0, len(files), batch_size):
+            batch = files[start:start + batch_size]
+            names = [f.name for f in batch]
+            payloads = [read_bytes(f) for f in batch]
+            hashes = [hashlib.sha256(p).hexdigest() for p in payloads]
+            results = extract_many(names, payloads, pool=pool)
+            del payloads
+
+            ok = [i for i, r in enumerate(results) if r.ok and r.text.strip()]
+            representative = {}
+            if duplicates is not None:
+                keys = [start + i for i in ok]
+                representative = {
+                    i: rep for i, key, rep in zip(ok, keys, duplicates.add_many(keys, [results[i].text for i in ok]))
+                    if rep != key
+                }
+                ok = [i for i in ok if i not in representative]
+            embeddings = {}
+            if ok:
+                vectors = encode([results[i].text for i in ok], model_name, batch_size=batch_size)
+                embeddings = dict(zip(ok, np.asarray(vectors, dtype=np.float32)))
+            count("candidate_records", len(batch))
+            for i, result in enumerate(results):
+                yield CandidateRecord(
+                    start + i,
+                    names[i],
+                    hashes[i],
+                    embedding=embeddings.get(i),
+                    error=None if i in embeddings or i in representative else result.error or "No text found",
+                    duplicate_of=representative.get(i),
+                )
+            del results, embeddings
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
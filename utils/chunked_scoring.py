@@ -0,0 +1,78 @@
+"""Chunked similarity for documents longer than the model's input window.
+
+MiniLM truncates input at 256 word pieces, so encoding a whole resume only
+"sees" its first few paragraphs. Here each document is split into overlapping
+word windows, all chunks are encoded in one batch, and the chunk-by-chunk
+similarity matrix is reduced to a single score.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.embedding import DEFAULT_MODEL_NAME, encode
+from utils.embedding_cache import text_key
+from utils.similarity import cosine_similarity
+
+# ~180 words stays under 256 word pieces for typical resume/JD English
+WINDOW_WORDS = 180
+STRIDE_WORDS = 120
+MAX_CACHED_DOCUMENTS = 512
+
+_doc_chunks = OrderedDict()
+_doc_chunks_lock = threading.Lock()
+
+
+def chunk_words(text, window=WINDOW_WORDS, stride=STRIDE_WORDS):
+    """Split text into overlapping windows of ``window`` words, ``stride`` words apart."""
+    words = text.split()
+    if len(words) <= window:
+        return [" ".join(words)] if words else []
+    starts = list(range(0, len(words) - window, stride)) + [len(words) - window]
+    return [" ".join(words[s:s + window]) for s in starts]
+
+
+def embed_documents(texts, model_name=DEFAULT_MODEL_NAME):
+    """Chunk embeddings for each document, as a list of (n_chunks, dim) arrays.
+
+    Chunk matrices are memoized per document hash; chunks of all uncached
+    documents go to the encoder in a single batch (through the persistent
+    embedding cache).
+    """
+    keys = [text_key(t, model_name) for t in texts]
+    with _doc_chunks_lock:
+        found = {k: _doc_chunks[k] for k in keys if k in _doc_chunks}
+        for k in found:
+            _doc_chunks.move_to_end(k)
+
+    pending = OrderedDict((k, chunk_words(t)) for k, t in zip(keys, texts) if k not in found)
+    all_chunks = [c for chunks in pending.values() for c in chunks]
+    if all_chunks:
+        vectors = np.atleast_2d(encode(all_chunks, model_name))
+        offset = 0
+        with _doc_chunks_lock:
+            for k, chunks in pending.items():
+                found[k] = _doc_chunks[k] = vectors[offset:offset + len(chunks)]
+                offset += len(chunks)
+            while len(_doc_chunks) > MAX_CACHED_DOCUMENTS:
+                _doc_chunks.popitem(last=False)
+    return [found.get(k, np.zeros((0, 0), dtype=np.float32)) for k in keys]
+
+
+def chunked_similarity(resume_text, jd_text, aggregate="mean_of_max", model_name=DEFAULT_MODEL_NAME):
+    """Similarity in [-1, 1] between two documents of any length.
+
+    aggregate:
+      "mean_of_max"  for every JD chunk take its best resume chunk, then average
+                     (how well the resume covers the whole JD)
+      "max"          the single best-matching chunk pair
+    """
+    resume_chunks, jd_chunks = embed_documents([resume_text, jd_text], model_name)
+    if not resume_chunks.size or not jd_chunks.size:
+        return 0.0
+    sim = cosine_similarity(jd_chunks, resume_chunks)
+    if aggregate == "max":
+        return float(sim.max())
+    if aggregate == "mean_of_max":
+        return float(sim.max(axis=1).mean())
+    raise ValueError(f"Unknown aggregate: {aggregate}")
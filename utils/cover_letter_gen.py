@@ -1,11 +1,11 @@
-import re
 import io
-import torch
-from fpdf import FPDF
-from sentence_transformers import SentenceTransformer, util
+import os
+import re
 
-# Load model once
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from utils.embedding import encode_tokens
+from utils.pdf_render import STANDARD, render_combined, render_letter, render_zip
+from utils.token_matcher import dedupe_tokens, match_tokens
+from utils.tokenization import tokenize
 
 
 def extract_contact_info(resume_text: str):
@@ -37,27 +37,17 @@ def extract_job_title(jd_text: str):
     return "the advertised position"
 
 
-def generate_cover_letter(resume_text: str, jd_text: str):
-    if not resume_text or not jd_text:
-        return "Please provide both resume and job description text.", None
-
-    def clean_text(t):
-        t = re.sub(r"[^a-zA-Z0-9\s]", " ", t.lower())
-        return re.sub(r"\s+", " ", t).strip()
-
-    resume_tokens = clean_text(resume_text).split()
-    jd_tokens = clean_text(jd_text).split()
+def compose_cover_letter(resume_text: str, jd_text: str, encode=encode_tokens):
+    """Cover letter text for one resume and job description (both non-empty).
 
-    resume_emb = model.encode(resume_tokens, convert_to_tensor=True)
-    jd_emb = model.encode(jd_tokens, convert_to_tensor=True)
-    sim_matrix = util.cos_sim(resume_emb, jd_emb)
+    ``encode`` maps a list of tokens to their embeddings.
+    """
+    resume_tokens = tokenize(resume_text).unique_tokens()
+    jd_tokens = tokenize(jd_text).unique_tokens()
 
-    matched = set()
-    for i, word in enumerate(resume_tokens):
-        if torch.max(sim_matrix[i]).item() > 0.7:
-            matched.add(word)
+    matched, _ = match_tokens(resume_tokens, jd_tokens, encode, threshold=0.7)
 
-    matched_text = ", ".join(sorted(list(matched)[:10])) or "data analysis and reporting"
+    matched_text = ", ".join(sorted(matched[:10])) or "data analysis and reporting"
 
     name, email, phone = extract_contact_info(resume_text)
     job_title = extract_job_title(jd_text)
@@ -84,23 +74,38 @@ Thank you for your time and consideration. I would welcome the opportunity to di
     if email or phone:
         text += f"\n{email} {phone}"
 
-    # ---- PDF generation ----
-    def sanitize_text(t):
-        t = re.sub(r"[^\x00-\x7F]+", " ", t)
-        t = re.sub(r"(\S{60,})", lambda m: m.group(1)[:60] + " ", t)
-        return t
+    return text
 
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.set_font("Helvetica", size=11)
 
-    safe_text = sanitize_text(text)
-    for line in safe_text.split("\n"):
-        pdf.multi_cell(180, 7, line)
-
-    pdf_bytes = bytes(pdf.output(dest="S"))
-    pdf_buffer = io.BytesIO(pdf_bytes)
-    pdf_buffer.seek(0)
+def generate_cover_letter(resume_text: str, jd_text: str):
+    if not resume_text or not jd_text:
+        return "Please provide both resume and job description text.", None
 
+    text = compose_cover_letter(resume_text, jd_text)
+    pdf_buffer = io.BytesIO(render_letter(text, STANDARD))
     return text, pdf_buffer
+
+
+def generate_cover_letters(named_resumes, jd_text: str, combined=False):
+    """Cover letters for a cohort of ``(name, resume_text)`` against one job description.
+
+    Token matching dominates, so the distinct tokens of the whole cohort are
+    embedded in one batch up front and each letter only gathers rows.
+    Returns ``(texts, data)``: ``data`` is a ZIP with one PDF per resume, or a
+    single PDF with every letter on its own pages when ``combined`` is set.
+    """
+    named_resumes = list(named_resumes)
+    vocabulary = dedupe_tokens(
+        [t for text in [jd_text] + [r for _, r in named_resumes] for t in tokenize(text).unique_tokens()]
+    )
+    vectors = encode_tokens(vocabulary)
+    rows = {t: i for i, t in enumerate(vocabulary)}
+
+    def lookup(tokens):
+        return vectors[[rows[t] for t in tokens]]
+
+    texts = [compose_cover_letter(resume, jd_text, lookup) for _, resume in named_resumes]
+    if combined:
+        return texts, render_combined(texts, STANDARD)
+    file_names = [f"cover_letter_{os.path.splitext(name)[0]}.pdf" for name, _ in named_resumes]
+    return texts, render_zip(zip(file_names, texts), STANDARD)
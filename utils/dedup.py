@@ -0,0 +1,114 @@
+"""Near-duplicate resume detection with MinHash signatures and LSH banding.
+
+Each document's word 5-shingles (from the shared tokenizer) are reduced to
+a 128-value MinHash signature; signatures are split into bands and
+bucketed, so a new document is only compared with documents that share a
+band bucket instead of with every earlier one. Candidates whose estimated
+Jaccard similarity reaches the threshold join that document's cluster.
+The band width is derived from the threshold (``bands_for``) so that pairs
+at the threshold almost always share a bucket: 32 bands of 4 for 0.7.
+"""
+import os
+import zlib
+
+import numpy as np
+
+from utils.metrics import count, span
+from utils.tokenization import tokenize
+
+NUM_PERM = 128
+SHINGLE_WORDS = 5
+THRESHOLD = float(os.environ.get("RESUME_SCREENER_DEDUP_THRESHOLD", "0.7"))
+# Chance that a pair exactly at the threshold becomes an LSH candidate
+BAND_RECALL = 0.99
+
+
+def bands_for(threshold, recall=BAND_RECALL):
+    """Fewest bands (widest, so fewest spurious candidates) that surface a pair at ``threshold`` with ``recall``."""
+    for rows in (16, 8, 4, 2, 1):
+        bands = NUM_PERM // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            return bands
+    return NUM_PERM
+
+
+BANDS = bands_for(THRESHOLD)
+
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, 2 ** 63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, size=NUM_PERM, dtype=np.uint64)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def shingle_hashes(text, k=SHINGLE_WORDS):
+    """32-bit hashes of the distinct word k-shingles of ``text``."""
+    doc = tokenize(text)
+    # Stable 32-bit hash per distinct token, expanded to the token sequence
+    vocab_hashes = np.array([zlib.crc32(t.encode("utf-8")) for t in doc.vocab], dtype=np.uint64)
+    ids = vocab_hashes[doc.ids]
+    if len(ids) == 0:
+        return np.empty(0, dtype=np.uint64)
+    k = min(k, len(ids))
+    n = len(ids) - k + 1
+    h = np.zeros(n, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for j in range(k):
+            h = h * np.uint64(1000003) + ids[j:j + n]
+        h = (h * _MIX) >> np.uint64(32)
+    return np.unique(h)
+
+
+def minhash(text):
+    """MinHash signature (``NUM_PERM`` uint32 values) of ``text``, or None for empty text."""
+    hashes = shingle_hashes(text)
+    if len(hashes) == 0:
+        return None
+    with np.errstate(over="ignore"):
+        return ((hashes[:, None] * _A + _B) >> np.uint64(32)).min(axis=0).astype(np.uint32)
+
+
+class DuplicateIndex:
+    """Incremental near-duplicate clustering over MinHash signatures.
+
+    ``add(key, text)`` returns the key of the cluster representative: the
+    first document added to the cluster, or ``key`` itself for a new one.
+    """
+
+    def __init__(self, threshold=THRESHOLD, bands=None):
+        self.threshold = threshold
+        self.bands = bands or bands_for(threshold)
+        self._rows = NUM_PERM // self.bands
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = {}
+        self._representative = {}
+
+    def _band_keys(self, signature):
+        return [signature[b * self._rows:(b + 1) * self._rows].tobytes() for b in range(self.bands)]
+
+    def add(self, key, text):
+        signature = minhash(text)
+        if signature is None:
+            self._representative[key] = key
+            return key
+
+        band_keys = self._band_keys(signature)
+        candidates = {other for band, bk in zip(self._buckets, band_keys) for other in band.get(bk, ())}
+        best, best_similarity = None, self.threshold
+        for other in candidates:
+            similarity = float(np.mean(self._signatures[other] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = other, similarity
+
+        representative = key if best is None else self._representative[best]
+        self._representative[key] = representative
+        self._signatures[key] = signature
+        for band, bk in zip(self._buckets, band_keys):
+            band.setdefault(bk, []).append(key)
+        return representative
+
+    def add_many(self, keys, texts):
+        """``add`` each document in order; returns the representative key of each."""
+        with span("dedup"):
+            representatives = [self.add(key, text) for key, text in zip(keys, texts)]
+        count("near_duplicates", sum(1 for k, r in zip(keys, representatives) if k != r))
+        return representatives
@@ -1,3 +1,167 @@
-# placeholder for embedding similarity, ready for SBERT upgrade later
+"""Shared sentence-embedding model registry.
+
+The model is imported and loaded lazily, once per process, on first use.
+Settings come from the environment (or ``configure()`` before first use):
+
+    RESUME_SCREENER_DEVICE    torch device, e.g. "cpu" or "cuda" (default: auto)
+    RESUME_SCREENER_THREADS   torch intra-op CPU threads (default: torch's choice)
+    RESUME_SCREENER_BACKEND   "torch" (default), "quantized" (dynamic int8 Linear
+                              layers, CPU only) or "onnx" (needs
+                              sentence-transformers>=3.2 with optimum installed)
+    RESUME_SCREENER_MICROBATCH "1" (default) routes encodes through the shared
+                              micro-batching EncodeService; "0" calls the model
+                              directly from the caller's thread
+    RESUME_SCREENER_CROSS_ENCODER cross-encoder name or local directory used to
+                              re-rank top candidates (utils/reranking.py)
+    RESUME_SCREENER_MODEL_DIR directory of pre-downloaded models; a model whose
+                              name (last path component) is a subdirectory here
+                              is loaded from it instead of the Hugging Face hub
+"""
+import os
+import threading
+import warnings
+
+from utils.embedding_cache import DEFAULT_CACHE_DIR, get_embedding_cache
+from utils.encode_service import get_encode_service
+from utils.metrics import count, span
+from utils.token_vocab import DEFAULT_LEXICON, get_vocabulary
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+DEFAULT_CROSS_ENCODER = os.environ.get("RESUME_SCREENER_CROSS_ENCODER", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+MODEL_DIR = os.environ.get("RESUME_SCREENER_MODEL_DIR", os.path.join(DEFAULT_CACHE_DIR, "models"))
+
+settings = {
+    "device": os.environ.get("RESUME_SCREENER_DEVICE") or None,
+    "num_threads": int(os.environ.get("RESUME_SCREENER_THREADS", "0")) or None,
+    "backend": os.environ.get("RESUME_SCREENER_BACKEND", "torch").lower(),
+    "micro_batching": os.environ.get("RESUME_SCREENER_MICROBATCH", "1") != "0",
+}
+
+_models = {}
+_cross_encoders = {}
+_lock = threading.Lock()
+_warm_up_thread = None
+
+
+def configure(device=None, num_threads=None, backend=None, micro_batching=None):
+    """Override environment settings; device/threads/backend only affect models loaded afterwards."""
+    if micro_batching is not None:
+        settings["micro_batching"] = micro_batching
+    if device is not None:
+        settings["device"] = device
+    if num_threads is not None:
+        settings["num_threads"] = num_threads
+    if backend is not None:
+        settings["backend"] = backend.lower()
+
+
+def resolve_model_path(name):
+    """``name`` itself if it is a directory, else its copy under MODEL_DIR if present, else ``name`` (a hub id)."""
+    if os.path.isdir(name):
+        return name
+    local = os.path.join(MODEL_DIR, name.rstrip("/").split("/")[-1])
+    return local if os.path.isdir(local) else name
+
+
+def _load(name):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    name = resolve_model_path(name)
+    if settings["num_threads"]:
+        torch.set_num_threads(settings["num_threads"])
+
+    if settings["backend"] == "onnx":
+        try:
+            return SentenceTransformer(name, device=settings["device"], backend="onnx")
+        except (TypeError, ImportError, ValueError) as e:
+            warnings.warn(f"ONNX backend unavailable ({e}); falling back to torch.")
+
+    model = SentenceTransformer(name, device=settings["device"])
+    if settings["backend"] == "quantized":
+        model.to("cpu")
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+
+def get_model(name=DEFAULT_MODEL_NAME):
+    """Return the process-wide SentenceTransformer for ``name``, loading it on first call."""
+    model = _models.get(name)
+    if model is None:
+        with _lock:
+            model = _models.get(name)
+            if model is None:
+                model = _models[name] = _load(name)
+    return model
+
+
+def get_cross_encoder(name=DEFAULT_CROSS_ENCODER):
+    """Return the process-wide sentence-transformers CrossEncoder for ``name``, loading it on first call."""
+    model = _cross_encoders.get(name)
+    if model is None:
+        with _lock:
+            model = _cross_encoders.get(name)
+            if model is None:
+                from sentence_transformers import CrossEncoder
+
+                with span("model_load"):
+                    model = _cross_encoders[name] = CrossEncoder(
+                        resolve_model_path(name), device=settings["device"], max_length=512
+                    )
+    return model
+
+
+def encoder(model_name=DEFAULT_MODEL_NAME, batch_size=64):
+    """Function mapping a list of texts to embeddings, honouring the micro-batching setting."""
+    if settings["micro_batching"]:
+        service = get_encode_service(model_name)
+        return lambda batch: service.encode(batch, batch_size=batch_size)
+
+    def encode_directly(batch):
+        count("encoded_texts", len(batch))
+        with span("encode"):
+            return get_model(model_name).encode(batch, batch_size=batch_size)
+
+    return encode_directly
+
+
+def encode(texts, model_name=DEFAULT_MODEL_NAME, batch_size=64):
+    """Embed document text(s) through the persistent embedding cache."""
+    return get_embedding_cache(model_name).encode(texts, encoder(model_name, batch_size))
+
+
+def encode_tokens(tokens, model_name=DEFAULT_MODEL_NAME):
+    """Embed individual words/skills through the process-wide token vocabulary."""
+    return get_vocabulary(model_name).embed(tokens, encoder(model_name, batch_size=256))
+
+
+def warm_up(model_name=DEFAULT_MODEL_NAME, background=True, lexicon=DEFAULT_LEXICON):
+    """Load the model, run one forward pass and prewarm the token vocabulary.
+
+    With ``background=True`` this runs once per process on a daemon thread and
+    returns immediately; later calls are no-ops.
+    """
+    global _warm_up_thread
+
+    def run():
+        with span("model_load"):
+            model = get_model(model_name)
+        model.encode(["warm up"])
+        if lexicon and os.path.exists(lexicon):
+            get_vocabulary(model_name).prewarm(
+                lexicon, lambda batch: get_model(model_name).encode(batch, batch_size=256)
+            )
+
+    if not background:
+        run()
+        return None
+    with _lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=run, name="model-warm-up", daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
+
+
 def compute_similarity(a, b):
+    """Cheap word-overlap similarity, kept for callers that do not need embeddings."""
     return len(set(a.lower().split()) & set(b.lower().split())) / max(len(a.split()), 1)
@@ -0,0 +1,262 @@
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.metrics import count
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "RESUME_SCREENER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "ai_resume_screener"),
+)
+DEFAULT_MAX_ENTRIES = int(os.environ.get("RESUME_SCREENER_EMBEDDING_CACHE_SIZE", "50000"))
+# Appended index lines before index.json is rewritten and the log truncated
+COMPACT_EVERY = 4096
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different copies share a cache key."""
+    return " ".join(text.split())
+
+
+def text_key(text, model_name):
+    """SHA-256 of the model name plus the normalized text."""
+    h = hashlib.sha256()
+    h.update(model_name.encode("utf-8"))
+    h.update(b"\0")
+    h.update(normalize_text(text).encode("utf-8"))
+    return h.hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed float32 embedding store backed by a memory-mapped array.
+
+    Vectors live in a fixed-size ``vectors.npy`` memmap of ``max_entries``
+    rows; ``index.json`` maps text keys to rows in least-recently-used order.
+    When the store is full the least recently used row is overwritten.
+
+    New rows are appended to ``index.log`` and replayed on load; the full
+    index is only rewritten every ``COMPACT_EVERY`` rows and at exit, so a
+    miss costs one short append rather than an O(entries) rewrite. (LRU
+    refreshes made since the last rewrite are lost on a crash, not entries.)
+
+    The memmap and index assume a single writer process. The directory is
+    locked with ``flock`` where available; another process opening the
+    same cache falls back to an in-memory store for its lifetime.
+    """
+
+    def __init__(self, model_name, cache_dir=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.directory = os.path.join(cache_dir, "embeddings", re.sub(r"[^A-Za-z0-9._-]", "_", model_name))
+        self._index_path = os.path.join(self.directory, "index.json")
+        self._log_path = os.path.join(self.directory, "index.log")
+        self._vectors_path = os.path.join(self.directory, "vectors.npy")
+        self._lock = threading.Lock()
+        self._slots = OrderedDict()
+        self._free = []
+        self._vectors = None
+        self._log = None
+        self._log_lines = 0
+        self._lock_file = None
+        self.hits = 0
+        self.misses = 0
+        self.persistent = self._acquire()
+        if self.persistent:
+            self._load()
+            atexit.register(self.close)
+
+    def _acquire(self):
+        """Take the directory's single-writer lock; False if another process holds it."""
+        os.makedirs(self.directory, exist_ok=True)
+        if fcntl is None:
+            return True
+        self._lock_file = open(os.path.join(self.directory, "lock"), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            warnings.warn(f"Embedding cache {self.directory} is in use by another process; caching in memory only.")
+            return False
+        return True
+
+    def _load(self):
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["max_entries"] != self.max_entries:
+                return
+            vectors = np.load(self._vectors_path, mmap_mode="r+")
+            if vectors.shape != (self.max_entries, meta["dim"]):
+                return
+        except (OSError, ValueError, KeyError):
+            return
+        self._vectors = vectors
+        self._slots = OrderedDict((key, slot) for key, slot in meta["slots"])
+        self._replay_log()
+        used = set(self._slots.values())
+        self._free = [s for s in range(self.max_entries - 1, -1, -1) if s not in used]
+
+    def _replay_log(self):
+        """Apply ``index.log`` (one ``[key, slot]`` per stored row) on top of the loaded index."""
+        owner = {slot: key for key, slot in self._slots.items()}
+        try:
+            with open(self._log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        key, slot = json.loads(line)
+                    except ValueError:
+                        break  # torn last line
+                    if not 0 <= slot < self.max_entries:
+                        continue
+                    previous = owner.get(slot)
+                    if previous is not None:
+                        self._slots.pop(previous, None)
+                    self._slots.pop(key, None)
+                    self._slots[key] = slot
+                    owner[slot] = key
+                    self._log_lines += 1
+        except OSError:
+            pass
+
+    def _create(self, dim):
+        if self.persistent:
+            self._vectors = np.lib.format.open_memmap(
+                self._vectors_path, mode="w+", dtype=np.float32, shape=(self.max_entries, dim)
+            )
+        else:
+            self._vectors = np.zeros((self.max_entries, dim), dtype=np.float32)
+        self._slots = OrderedDict()
+        self._free = list(range(self.max_entries - 1, -1, -1))
+        if self.persistent:
+            self._save()
+
+    def _append_log(self, entries):
+        if self._log is None:
+            self._log = open(self._log_path, "a", encoding="utf-8")
+        self._log.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        self._log.flush()
+        self._log_lines += len(entries)
+        if self._log_lines >= COMPACT_EVERY:
+            self._save()
+
+    def _save(self):
+        """Rewrite index.json from the in-memory index and truncate the log."""
+        self._vectors.flush()
+        meta = {
+            "model": self.model_name,
+            "dim": int(self._vectors.shape[1]),
+            "max_entries": self.max_entries,
+            "slots": list(self._slots.items()),
+        }
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._index_path)
+        if self._log is not None:
+            self._log.close()
+        self._log = open(self._log_path, "w", encoding="utf-8")
+        self._log_lines = 0
+
+    def close(self):
+        """Write the full index and release the directory lock."""
+        with self._lock:
+            if self.persistent and self._vectors is not None:
+                self._save()
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+            self.persistent = False
+
+    def _lookup(self, keys):
+        """Return {key: vector copy} for cached keys, refreshing their LRU position."""
+        found = {}
+        if self._vectors is None:
+            return found
+        for key in keys:
+            slot = self._slots.get(key)
+            if slot is not None and key not in found:
+                self._slots.move_to_end(key)
+                found[key] = np.array(self._vectors[slot])
+        return found
+
+    def _store(self, keys, vectors):
+        if self._vectors is None or self._vectors.shape[1] != vectors.shape[1]:
+            self._create(vectors.shape[1])
+        stored = []
+        for key, vector in zip(keys, vectors):
+            if key in self._slots:
+                continue
+            if self._free:
+                slot = self._free.pop()
+            else:
+                _, slot = self._slots.popitem(last=False)
+            self._vectors[slot] = vector
+            self._slots[key] = slot
+            stored.append((key, slot))
+        if self.persistent and stored:
+            self._append_log(stored)
+
+    def encode(self, texts, encoder):
+        """Return float32 embeddings for ``texts``, calling ``encoder`` only on misses.
+
+        ``encoder`` takes a list of strings and returns an array of embeddings;
+        it is called at most once per call, with the unique uncached texts.
+        A single string returns a 1-D vector, a list returns a 2-D array.
+        """
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        keys = [text_key(t, self.model_name) for t in texts]
+
+        with self._lock:
+            found = self._lookup(keys)
+
+        pending = OrderedDict()
+        for key, text in zip(keys, texts):
+            if key not in found and key not in pending:
+                pending[key] = text
+        hits = len(keys) - sum(1 for k in keys if k in pending)
+        self.hits += hits
+        self.misses += len(pending)
+        count("embedding_cache_hit", hits)
+        count("embedding_cache_miss", len(pending))
+
+        if pending:
+            new = np.asarray(encoder(list(pending.values())), dtype=np.float32)
+            new_keys = list(pending)
+            with self._lock:
+                self._store(new_keys, new)
+            found.update(zip(new_keys, new))
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        result = np.stack([found[k] for k in keys])
+        return result[0] if single else result
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name):
+    """Process-wide EmbeddingCache for ``model_name``."""
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(model_name)
+        return _caches[model_name]
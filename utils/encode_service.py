@@ -0,0 +1,154 @@
+"""In-process micro-batching encoder shared by all Streamlit sessions.
+
+Every session's script thread submits texts to one queue; a single worker
+thread per model coalesces whatever arrives within ``max_latency`` seconds
+(or until ``max_batch_size`` texts are queued) into one ``model.encode``
+call and resolves each caller's future with its slice of the result.
+
+Requests larger than ``max_batch_size`` are split into slices of at most
+that size, and slices of small requests are served first, so a bulk upload
+being encoded delays an interactive request by at most one slice.
+"""
+import asyncio
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from utils.metrics import count, span
+
+MAX_BATCH_SIZE = int(os.environ.get("RESUME_SCREENER_MAX_BATCH", "64"))
+MAX_LATENCY = float(os.environ.get("RESUME_SCREENER_BATCH_LATENCY_MS", "10")) / 1000
+
+
+class EncodeService:
+    """Queue-fed encoder that merges concurrent requests into micro-batches."""
+
+    def __init__(self, model_getter, max_batch_size=MAX_BATCH_SIZE, max_latency=MAX_LATENCY):
+        self._model_getter = model_getter
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="encode-service", daemon=True)
+                self._thread.start()
+
+    def submit(self, texts, batch_size=None):
+        """Queue a list of texts; returns a Future resolving to a (len(texts), dim) array.
+
+        The texts are queued in slices of ``batch_size`` (at most
+        ``max_batch_size``); requests that fit in one slice take priority.
+        """
+        texts = list(texts)
+        if not texts:
+            future = Future()
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return future
+        size = min(batch_size or self.max_batch_size, self.max_batch_size)
+        priority = 0 if len(texts) <= size else 1
+        slices = []
+        for start in range(0, len(texts), size):
+            future = Future()
+            self._queue.put((priority, next(self._sequence), texts[start:start + size], future))
+            slices.append(future)
+        self._ensure_started()
+        return slices[0] if len(slices) == 1 else _gather(slices)
+
+    def encode(self, texts, timeout=None, batch_size=None):
+        """Blocking convenience wrapper around ``submit``."""
+        return self.submit(texts, batch_size).result(timeout)
+
+    async def encode_async(self, texts, batch_size=None):
+        """Awaitable wrapper around ``submit`` for asyncio callers."""
+        return await asyncio.wrap_future(self.submit(texts, batch_size))
+
+    def _collect(self):
+        """Block for one slice, then gather more until the batch is full or the deadline passes."""
+        item = self._queue.get()
+        batch = [item[2:]]
+        size = len(item[2])
+        deadline = time.monotonic() + self.max_latency
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(item[2]) > self.max_batch_size:
+                self._queue.put(item)
+                break
+            batch.append(item[2:])
+            size += len(item[2])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [(texts, f) for texts, f in self._collect() if f.set_running_or_notify_cancel()]
+            texts = [t for request, _ in batch for t in request]
+            if not texts:
+                continue
+            count("encoded_texts", len(texts))
+            try:
+                with span("encode"):
+                    vectors = np.asarray(
+                        self._model_getter().encode(texts, batch_size=self.max_batch_size), dtype=np.float32
+                    )
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.requests += len(batch)
+            offset = 0
+            for request, future in batch:
+                future.set_result(vectors[offset:offset + len(request)])
+                offset += len(request)
+
+
+def _gather(slices):
+    """Future for the concatenated results of ``slices``, failing with the first slice error."""
+    future = Future()
+    remaining = [len(slices)]
+    lock = threading.Lock()
+
+    def done(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] or future.done():
+                return
+        try:
+            future.set_result(np.concatenate([f.result() for f in slices]))
+        except Exception as e:
+            future.set_exception(e)
+
+    for f in slices:
+        f.add_done_callback(done)
+    return future
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_encode_service(model_name):
+    """Process-wide EncodeService for ``model_name``."""
+    with _services_lock:
+        if model_name not in _services:
+            from utils.embedding import get_model
+
+            _services[model_name] = EncodeService(lambda: get_model(model_name))
+        return _services[model_name]
@@ -0,0 +1,107 @@
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from utils.embedding_cache import DEFAULT_CACHE_DIR
+
+MAX_MEMORY_CHARS = int(float(os.environ.get("RESUME_SCREENER_EXTRACTION_CACHE_MB", "64")) * 1024 * 1024)
+DISK_CACHE_ENABLED = os.environ.get("RESUME_SCREENER_EXTRACTION_DISK_CACHE", "0") == "1"
+DEFAULT_DISK_DIR = os.path.join(DEFAULT_CACHE_DIR, "extractions")
+
+
+def content_key(name, data, *options):
+    """SHA-256 of the file bytes, qualified by file type and extraction options."""
+    suffix = os.path.splitext(name.lower())[1]
+    qualifier = ":".join(str(o) for o in (suffix,) + options)
+    return f"{hashlib.sha256(data).hexdigest()}:{qualifier}"
+
+
+class ExtractionCache:
+    """Content-addressed cache of extraction results.
+
+    Tier 1 is an in-memory LRU bounded by the total characters of cached text;
+    tier 2 (optional) is one JSON file per key under ``disk_dir``. Values are
+    dataclass instances (ExtractionResult); ``name`` is not part of the key,
+    so identical bytes uploaded under another name are a hit. Results with an
+    ``error`` are never stored.
+    """
+
+    def __init__(self, max_chars=MAX_MEMORY_CHARS, disk_dir=DEFAULT_DISK_DIR if DISK_CACHE_ENABLED else None):
+        self.max_chars = max_chars
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        digest, _, qualifier = key.partition(":")
+        return os.path.join(self.disk_dir, digest[:2], f"{digest}.{qualifier.replace(':', '.')}.json")
+
+    def _remember(self, key, value):
+        if key in self._entries:
+            return
+        size = len(value.text)
+        if size > self.max_chars:
+            return
+        self._entries[key] = value
+        self._chars += size
+        while self._chars > self.max_chars:
+            _, evicted = self._entries.popitem(last=False)
+            self._chars -= len(evicted.text)
+
+    def get(self, key, result_type):
+        """Return a cached result (a fresh copy) or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dataclasses.replace(value)
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), encoding="utf-8") as f:
+                    value = result_type(**json.load(f))
+            except (OSError, ValueError, TypeError):
+                value = None
+            if value is not None:
+                with self._lock:
+                    self._remember(key, value)
+                    self.hits += 1
+                return dataclasses.replace(value)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Cache ``value`` unless it records an error (errors may be transient and are retried)."""
+        if getattr(value, "error", None):
+            return
+        with self._lock:
+            self._remember(key, dataclasses.replace(value))
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(dataclasses.asdict(value), f)
+                os.replace(path + ".tmp", path)
+            except OSError:
+                pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache():
+    """Process-wide ExtractionCache shared by every page and session."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache()
+        return _cache
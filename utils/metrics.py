@@ -0,0 +1,176 @@
+"""Lightweight in-process timing spans and counters with Prometheus text export.
+
+    with span("extract"):
+        ...
+    count("embedding_cache_hit", 3)
+
+``render_prometheus()`` returns the current values in the Prometheus text
+exposition format. ``start_exporters()`` optionally serves them over HTTP
+on localhost (RESUME_SCREENER_METRICS_PORT) and/or rewrites a file every few
+seconds (RESUME_SCREENER_METRICS_FILE, e.g. for node_exporter's textfile
+collector). Work done inside worker processes is only visible through the
+parent's spans and the counters it records when results come back.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "resume_screener"
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_exporters_started = False
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (seconds)."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside the bucket that contains it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if seen + c >= rank and c:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / c
+            seen += c
+        return self.buckets[-1]
+
+
+def observe(stage, seconds):
+    with _lock:
+        if stage not in _histograms:
+            _histograms[stage] = Histogram()
+        _histograms[stage].observe(seconds)
+
+
+@contextmanager
+def span(stage):
+    """Time the enclosed block into the ``stage`` latency histogram (also on error)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def count(event, value=1):
+    """Increment the ``event`` counter."""
+    with _lock:
+        _counters[event] = _counters.get(event, 0) + value
+
+
+def snapshot():
+    """Copy of the current metrics: ({stage: Histogram}, {event: value})."""
+    with _lock:
+        histograms = {}
+        for stage, h in _histograms.items():
+            copy = Histogram(h.buckets)
+            copy.counts, copy.sum, copy.count = list(h.counts), h.sum, h.count
+            histograms[stage] = copy
+        return histograms, dict(_counters)
+
+
+def hit_rate(name):
+    """Fraction of ``<name>_hit`` over ``<name>_hit + <name>_miss``, or None with no lookups."""
+    _, counters = snapshot()
+    hits, misses = counters.get(f"{name}_hit", 0), counters.get(f"{name}_miss", 0)
+    return hits / (hits + misses) if hits + misses else None
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format."""
+    histograms, counters = snapshot()
+    lines = [
+        f"# HELP {PREFIX}_stage_seconds Latency of instrumented pipeline stages.",
+        f"# TYPE {PREFIX}_stage_seconds histogram",
+    ]
+    for stage, h in sorted(histograms.items()):
+        cumulative = 0
+        for bound, c in zip(list(h.buckets) + ["+Inf"], h.counts):
+            cumulative += c
+            lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {h.sum:.6f}')
+        lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {h.count}')
+    lines += [
+        f"# HELP {PREFIX}_events_total Counted events such as cache hits and misses.",
+        f"# TYPE {PREFIX}_events_total counter",
+    ]
+    for event, value in sorted(counters.items()):
+        lines.append(f'{PREFIX}_events_total{{event="{event}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def dump(path):
+    """Atomically write the Prometheus text to ``path``."""
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(path + ".tmp", path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_exporters(port=None, path=None, interval=15.0, host=None):
+    """Start the HTTP endpoint and/or periodic file dump once per process.
+
+    The endpoint listens on localhost unless ``host`` (or
+    RESUME_SCREENER_METRICS_HOST) says otherwise, e.g. ``0.0.0.0``.
+    """
+    global _exporters_started
+    port = port or int(os.environ.get("RESUME_SCREENER_METRICS_PORT", "0"))
+    host = host or os.environ.get("RESUME_SCREENER_METRICS_HOST", "127.0.0.1")
+    path = path or os.environ.get("RESUME_SCREENER_METRICS_FILE")
+    with _lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    if port:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    if path:
+        def loop():
+            while True:
+                try:
+                    dump(path)
+                except OSError:
+                    pass
+                time.sleep(interval)
+
+        threading.Thread(target=loop, name="metrics-dump", daemon=True).start()
@@ -0,0 +1,213 @@
+"""Fast plain-text letter rendering to PDF, single or in bulk.
+
+FPDF builds a full document model for every letter, and per-letter setup
+dominates when whole cohorts are generated at once. A letter only needs
+one core font and wrapped lines of text, so ``LetterRenderer`` prepares
+the font object, glyph widths and page geometry once. Each render then
+only wraps the text, writes the compressed page streams and the
+cross-reference table into a reused buffer. Glyph widths come from
+fpdf2's Helvetica metrics, and text is encoded as cp1252 (WinAnsiEncoding),
+so typographic quotes and accented Latin letters survive.
+
+``render_zip`` and ``render_combined`` produce many letters at once. A
+letter renders in well under a millisecond, so both run serially in the
+calling thread.
+"""
+import io
+import os
+import threading
+import zipfile
+import zlib
+
+from fpdf.fonts import CORE_FONTS_CHARWIDTHS
+
+from utils.metrics import count, span
+
+PT_PER_MM = 72 / 25.4
+PAGE_WIDTH, PAGE_HEIGHT = 210.0, 297.0  # A4, mm
+MARGIN = 10.0
+CELL_PADDING = 1.0
+
+# Layouts of the two generators: the long letter is justified, the short one left aligned
+STANDARD = {"font_size": 11, "line_height": 7, "width": 180, "align": "J"}
+COMPACT = {"font_size": 12, "line_height": 8, "width": 190, "align": "L"}
+
+_HEADER = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+_FONT = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+
+
+def _escape(data):
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+class LetterRenderer:
+    """Renders plain text to A4 PDF pages with a fixed Helvetica layout.
+
+    ``width`` (mm) is the text column including 1 mm padding on each side,
+    ``align`` is "L" or "J" (justified, except the last line of a paragraph).
+    Not thread-safe; use ``get_renderer`` for a per-thread instance.
+    """
+
+    def __init__(self, font_size=11, line_height=7, width=180, align="L", bottom_margin=15):
+        self.font_size = font_size
+        self.line_height = line_height
+        self.align = align
+        metrics = CORE_FONTS_CHARWIDTHS["helvetica"]
+        self._widths = [metrics[chr(i)] * font_size / 1000 for i in range(256)]
+        self._space = self._widths[32]
+        self._max_width = (width - 2 * CELL_PADDING) * PT_PER_MM
+        self._x = (MARGIN + CELL_PADDING) * PT_PER_MM
+        self._baseline = (line_height / 2) * PT_PER_MM + 0.3 * font_size
+        self._page_bottom = PAGE_HEIGHT - bottom_margin
+        self._page = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH * PT_PER_MM:.2f} {PAGE_HEIGHT * PT_PER_MM:.2f}] "
+            "/Resources << /Font << /F1 3 0 R >> >> /Contents {} 0 R >>"
+        )
+        self._buffer = io.BytesIO()
+
+    def _word_width(self, word):
+        widths = self._widths
+        return sum(widths[c] for c in word)
+
+    def _wrap(self, paragraph):
+        """Greedy word wrap of one cp1252-encoded paragraph into (words, words_width) lines."""
+        lines, current, current_width = [], [], 0.0
+        for word in paragraph.split():
+            w = self._word_width(word)
+            if w > self._max_width:
+                # Break words longer than a whole line at the last character that fits
+                if current:
+                    lines.append((current, current_width))
+                    current, current_width = [], 0.0
+                piece, piece_width = bytearray(), 0.0
+                for c in word:
+                    if piece_width + self._widths[c] > self._max_width and piece:
+                        lines.append(([bytes(piece)], piece_width))
+                        piece, piece_width = bytearray(), 0.0
+                    piece.append(c)
+                    piece_width += self._widths[c]
+                word, w = bytes(piece), piece_width
+            extra = w + (self._space if current else 0.0)
+            if current and current_width + extra > self._max_width:
+                lines.append((current, current_width))
+                current, current_width = [word], w
+            else:
+                current.append(word)
+                current_width += extra
+        lines.append((current, current_width))
+        return lines
+
+    def _layout(self, text):
+        """Content streams, one per page, for ``text``."""
+        pages, ops = [], []
+        y = MARGIN
+        for paragraph in text.split("\n"):
+            lines = self._wrap(paragraph.encode("cp1252", "replace"))
+            for n, (words, words_width) in enumerate(lines):
+                if y + self.line_height > self._page_bottom and ops:
+                    pages.append(ops)
+                    ops, y = [], MARGIN
+                if words:
+                    spacing = 0.0
+                    if self.align == "J" and n < len(lines) - 1 and len(words) > 1:
+                        spacing = (self._max_width - words_width) / (len(words) - 1)
+                    baseline = (PAGE_HEIGHT - y) * PT_PER_MM - self._baseline
+                    ops.append(
+                        b"%.3f Tw 1 0 0 1 %.2f %.2f Tm (%s) Tj"
+                        % (spacing, self._x, baseline, _escape(b" ".join(words)))
+                    )
+                y += self.line_height
+        pages.append(ops)
+        prefix = b"BT /F1 %.2f Tf\n" % self.font_size
+        return [zlib.compress(prefix + b"\n".join(ops) + b"\nET") for ops in pages]
+
+    def _write(self, streams):
+        buffer = self._buffer
+        buffer.seek(0)
+        buffer.truncate()
+        offsets = {}
+
+        def obj(number, body):
+            offsets[number] = buffer.tell()
+            buffer.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+
+        buffer.write(_HEADER)
+        obj(3, _FONT)
+        kids = []
+        for i, stream in enumerate(streams):
+            content, page = 4 + 2 * i, 5 + 2 * i
+            obj(content, b"<< /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+            obj(page, self._page.format(content).encode("ascii"))
+            kids.append(b"%d 0 R" % page)
+        obj(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids)))
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref = buffer.tell()
+        size = len(offsets) + 1
+        buffer.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        buffer.write(b"".join(b"%010d 00000 n \n" % offsets[n] for n in range(1, size)))
+        buffer.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref))
+        return buffer.getvalue()
+
+    def render(self, text):
+        """PDF bytes for one letter."""
+        with span("pdf_render"):
+            return self._write(self._layout(text))
+
+    def render_combined(self, texts):
+        """One PDF containing every letter, each starting on a new page."""
+        with span("pdf_render_bulk"):
+            return self._write([stream for text in texts for stream in self._layout(text)])
+
+
+_local = threading.local()
+
+
+def get_renderer(**style):
+    """Per-thread LetterRenderer for ``style`` (keyword arguments of LetterRenderer)."""
+    renderers = getattr(_local, "renderers", None)
+    if renderers is None:
+        renderers = _local.renderers = {}
+    key = tuple(sorted(style.items()))
+    if key not in renderers:
+        renderers[key] = LetterRenderer(**style)
+    return renderers[key]
+
+
+def render_letter(text, style=STANDARD):
+    """PDF bytes for one letter in ``style`` (STANDARD or COMPACT)."""
+    return get_renderer(**style).render(text)
+
+
+def unique_names(names):
+    """``names`` with repeats suffixed ``_2``, ``_3``, … before the extension, so archive entries stay distinct."""
+    seen, out = set(), []
+    for name in names:
+        candidate, n = name, 1
+        while candidate in seen:
+            n += 1
+            root, ext = os.path.splitext(name)
+            candidate = f"{root}_{n}{ext}"
+        seen.add(candidate)
+        out.append(candidate)
+    return out
+
+
+def render_zip(named_texts, style=STANDARD):
+    """ZIP archive bytes with one PDF per ``(file_name, text)``; repeated file names get a numeric suffix."""
+    named_texts = list(named_texts)
+    count("letters_rendered", len(named_texts))
+    renderer = get_renderer(**style)
+    buffer = io.BytesIO()
+    with span("pdf_render_bulk"):
+        # Page streams are already deflated, so store rather than recompress
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+            for name, (_, text) in zip(unique_names([n for n, _ in named_texts]), named_texts):
+                archive.writestr(name, renderer.render(text))
+    return buffer.getvalue()
+
+
+def render_combined(texts, style=STANDARD):
+    """One multi-letter PDF, each letter starting on a new page."""
+    count("letters_rendered", len(texts))
+    return get_renderer(**style).render_combined(texts)
@@ -0,0 +1,61 @@
+"""Int8 scalar quantization of unit embeddings, with a per-vector scale.
+
+Each vector is stored as int8 codes ``round(x / scale)`` plus one float32
+``scale = max|x| / 127``: 388 bytes for a 384-d MiniLM embedding instead of
+1,536. ``quantized_topk`` scans the codes blockwise (the same scan as
+``topk_blocked``, converting one block at a time to float32 for BLAS) and,
+when the float vectors are given, re-scores the best ``k * oversample``
+candidates exactly, so only those rows of the float vectors are read.
+"""
+import numpy as np
+
+from utils.metrics import span
+from utils.similarity import _merge_topk, _sort_topk, topk_blocked
+
+QMAX = 127
+OVERSAMPLE = 4
+BLOCK_SIZE = 4096
+
+
+def quantize(vectors):
+    """``(codes, scales)``: int8 codes of shape (n, dim) and float32 scales of shape (n,)."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / QMAX
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize(codes, scales):
+    """Approximate float32 vectors from ``quantize`` output."""
+    return np.asarray(codes, dtype=np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+
+def rescore(queries, vectors, indices, k):
+    """Exact top-k of each query among its candidate rows ``indices`` of ``vectors``."""
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    if indices.size == 0:
+        return indices.astype(np.float32), indices
+    rows = np.unique(indices)
+    # One sorted gather of the distinct candidate rows, shared by all queries
+    scores = queries @ np.asarray(vectors[rows], dtype=np.float32).T
+    exact = np.take_along_axis(scores, np.searchsorted(rows, indices), axis=1)
+    return _sort_topk(*_merge_topk(exact, indices, k))
+
+
+def quantized_topk(queries, codes, scales, k, vectors=None, oversample=OVERSAMPLE, block_size=BLOCK_SIZE,
+                   row_ids=None):
+    """Top-k inner products of each query against quantized rows.
+
+    Ranks on the int8 ``codes`` and ``scales``; with float ``vectors`` (which
+    may be a memmap) the best ``k * oversample`` rows per query are re-scored
+    exactly. Returns ``(scores, indices)`` of shape (n_queries, <=k), best
+    first, like ``topk_blocked``.
+    """
+    with span("quantized_search"):
+        scores, indices = topk_blocked(
+            queries, codes, k if vectors is None else k * oversample,
+            block_size=block_size, row_ids=row_ids, scales=np.asarray(scales, dtype=np.float32),
+        )
+        if vectors is None:
+            return scores[:, :k], indices[:, :k]
+        return rescore(queries, vectors, indices, k)
@@ -0,0 +1,80 @@
+"""Second-stage re-ranking of the best bi-encoder matches with a cross-encoder.
+
+The bi-encoder cosine pass orders the whole pool cheaply; only its top
+``top_n`` resumes are paired with the job description and rescored by the
+cross-encoder, in batches, until the pool or the time budget runs out.
+If the cross-encoder cannot be loaded or fails, the bi-encoder order is kept;
+a model that failed to load is not retried for ``RETRY_AFTER`` seconds.
+
+    RESUME_SCREENER_RERANK_TOP       candidates rescored (default 50)
+    RESUME_SCREENER_RERANK_BUDGET_S  seconds allowed for rescoring (default 10)
+"""
+import os
+import time
+import warnings
+
+import numpy as np
+
+from utils.embedding import DEFAULT_CROSS_ENCODER, get_cross_encoder
+from utils.metrics import count, span
+
+RERANK_TOP = int(os.environ.get("RESUME_SCREENER_RERANK_TOP", "50"))
+RERANK_BUDGET = float(os.environ.get("RESUME_SCREENER_RERANK_BUDGET_S", "10"))
+# The cross-encoder truncates pairs to 512 tokens; cap the characters it has to tokenize
+MAX_DOCUMENT_CHARS = 4000
+RETRY_AFTER = 300
+
+_load_failures = {}
+
+
+def _load_model(model_name):
+    failed_at = _load_failures.get(model_name)
+    if failed_at is not None and time.monotonic() - failed_at < RETRY_AFTER:
+        return None
+    try:
+        model = get_cross_encoder(model_name)
+    except Exception as e:
+        _load_failures[model_name] = time.monotonic()
+        count("rerank_failures")
+        warnings.warn(f"Cross-encoder {model_name} unavailable ({e}); keeping the bi-encoder order.")
+        return None
+    _load_failures.pop(model_name, None)
+    return model
+
+
+def rerank(query, documents, order, top_n=RERANK_TOP, time_budget=RERANK_BUDGET, batch_size=16,
+           model_name=DEFAULT_CROSS_ENCODER):
+    """Rescore the first ``top_n`` of ``order`` (indices into ``documents``) against ``query``.
+
+    Batches are scored best-first while the next one is expected to fit in
+    ``time_budget`` seconds (the first always runs) and the model works. Returns ``(order, scores)``:
+    the rescored indices sorted by cross-encoder relevance (0-1), followed by
+    the rest of ``order`` unchanged, and {index: relevance} for those rescored
+    (sentence-transformers applies a sigmoid to single-label cross-encoders).
+    """
+    order = list(order)
+    head = order[:top_n]
+    model = _load_model(model_name) if head else None
+    if model is None:
+        return order, {}
+    scores = {}
+    start = time.perf_counter()
+    with span("rerank"):
+        for offset in range(0, len(head), batch_size):
+            elapsed = time.perf_counter() - start
+            if offset and elapsed + elapsed / offset * batch_size > time_budget:
+                break
+            batch = head[offset:offset + batch_size]
+            try:
+                relevance = model.predict(
+                    [(query, documents[i][:MAX_DOCUMENT_CHARS]) for i in batch], batch_size=batch_size
+                )
+            except Exception as e:
+                # Keep what was rescored so far, as when the time budget runs out
+                count("rerank_failures")
+                warnings.warn(f"Cross-encoder scoring failed ({e}); keeping the bi-encoder order for the rest.")
+                break
+            scores.update(zip(batch, np.asarray(relevance, dtype=np.float32).reshape(-1).tolist()))
+    count("reranked_pairs", len(scores))
+    rescored = sorted(scores, key=lambda i: -scores[i])
+    return rescored + [i for i in order if i not in scores], scores
@@ -1,28 +1,48 @@
-from sentence_transformers import SentenceTransformer, util
 import numpy as np
-import re
 
-# Load model only once
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from utils.candidates import iter_candidate_records
+from utils.chunked_scoring import chunked_similarity
+from utils.embedding import DEFAULT_MODEL_NAME as MODEL_NAME, encode, encode_tokens
+from utils.metrics import count, span
+from utils.reranking import RERANK_BUDGET, rerank
+from utils.similarity import cosine_similarity, normalize_rows, topk_matrix
+from utils.skills import get_skill_matcher
+from utils.tokenization import tokenize
+from utils.text_extraction import extract_many, read_bytes
+
+def embed(texts, batch_size=64):
+    """Embed text(s) through the persistent embedding cache."""
+    return encode(texts, MODEL_NAME, batch_size=batch_size)
+
+def embed_tokens(tokens):
+    """Embed individual words/skills through the process-wide token vocabulary."""
+    return encode_tokens(tokens, MODEL_NAME)
+
+def calculate_ats_score(resume_text, jd_text, model_name=MODEL_NAME):
+    """ATS-style match score (0-100) over the full length of both documents."""
+    if not resume_text or not jd_text:
+        return 0.0
+    return round(chunked_similarity(resume_text, jd_text, model_name=model_name) * 100, 2)
 
 def extract_keywords(text):
-    """Extract relevant keywords from JD text."""
-    text = text.lower()
-    text = re.sub(r'[^a-zA-Z0-9\s\+\#]', ' ', text)
-    words = text.split()
-    stop_words = set([
-        'the','and','for','with','that','this','are','was','were','to','of','in','on','as','at','by','be','an','it','or','from'
-    ])
-    keywords = [w for w in words if len(w) > 2 and w not in stop_words]
-    # Keep unique terms
-    return list(set(keywords))
+    """Extract relevant keywords from JD text.
+
+    Skills from the shared lexicon (with synonyms folded to their canonical
+    name) when the text mentions any; otherwise every non-trivial word.
+    """
+    skills = get_skill_matcher().find(text)
+    if skills:
+        return skills
+    return tokenize(text).keywords()
 
 def compare_keywords_semantic(resume_text, jd_text, threshold_high=0.7, threshold_low=0.4):
     jd_keywords = extract_keywords(jd_text)
-    resume_emb = model.encode(resume_text, convert_to_tensor=True)
-    jd_embs = model.encode(jd_keywords, convert_to_tensor=True)
+    if not jd_keywords:
+        return []
+    resume_emb = embed(resume_text)
+    jd_embs = embed_tokens(jd_keywords)
 
-    similarities = util.cos_sim(jd_embs, resume_emb)
+    similarities = cosine_similarity(jd_embs, resume_emb)
 
     results = []
     for idx, kw in enumerate(jd_keywords):
@@ -36,3 +56,120 @@ def compare_keywords_semantic(resume_text, jd_text, threshold_high=0.7, threshol
         results.append((kw, round(sim*100, 1), status))
     
     return sorted(results, key=lambda x: x[1], reverse=True)
+
+def rank_resumes(files, jd_text, batch_size=64, max_workers=None, index=None, rerank_top=0,
+                 rerank_budget=RERANK_BUDGET, dedupe=False):
+    """Rank uploaded PDF resumes against a job description.
+
+    Resumes are streamed through ``iter_candidate_records`` (parsed in
+    parallel and embedded ``batch_size`` at a time, keeping only a compact
+    record per file) and scored with one resumes-vs-JD cosine similarity.
+    If a CandidateIndex is given, the resume embeddings are also added to it.
+    With ``rerank_top`` > 0 the best that many are re-ordered by a
+    cross-encoder within ``rerank_budget`` seconds (see utils.reranking)
+    and carry a "Rerank Score (%)". With ``dedupe`` near-duplicate uploads
+    are clustered before embedding (see utils.dedup); only one representative
+    per cluster is scored and its row lists the others as "Near Duplicates".
+    Returns a list of {"Resume", "Match Score (%)"} dicts, best first;
+    files that could not be read come last with an "Error" entry.
+    """
+    if not files or not jd_text:
+        return []
+    with span("rank_resumes"):
+        return _rank(files, jd_text, batch_size, max_workers, index, rerank_top, rerank_budget, dedupe)
+
+
+def _near_duplicates(records):
+    """{representative file_id: "name, name"} for records folded into a near-duplicate cluster."""
+    clusters = {}
+    for r in records:
+        if r.duplicate_of is not None:
+            clusters.setdefault(r.duplicate_of, []).append(r.name)
+    return {file_id: ", ".join(names) for file_id, names in clusters.items()}
+
+
+def _rank(files, jd_text, batch_size, max_workers, index, rerank_top, rerank_budget, dedupe):
+    jd_emb = embed(jd_text)
+    records = list(iter_candidate_records(files, batch_size=batch_size, max_workers=max_workers, dedupe=dedupe))
+    ok = [r for r in records if r.ok]
+    failed = [{"Resume": r.name, "Match Score (%)": None, "Error": r.error} for r in records if r.error]
+    near_duplicates = _near_duplicates(records)
+    count("resumes_ranked", len(ok))
+    if not ok:
+        return failed
+
+    resume_embs = np.stack([r.embedding for r in ok])
+    if index is not None:
+        index.add([r.sha256 for r in ok], resume_embs, [r.name for r in ok])
+    scores = cosine_similarity(jd_emb, resume_embs)[0]
+    for record, score in zip(ok, scores):
+        record.score = float(score)
+
+    order = np.argsort(-scores, kind="stable")
+    relevance = {}
+    if rerank_top:
+        # Texts were dropped while streaming; re-read only the finalists (usually extraction cache hits)
+        head = [int(i) for i in order[:rerank_top]]
+        finalists = [files[ok[i].file_id] for i in head]
+        texts = extract_many([f.name for f in finalists], [read_bytes(f) for f in finalists], max_workers=max_workers)
+        order, relevance = rerank(
+            jd_text, {i: r.text for i, r in zip(head, texts)}, order, top_n=rerank_top, time_budget=rerank_budget
+        )
+    ranked = []
+    for i in order:
+        row = {"Resume": ok[i].name, "Match Score (%)": round(ok[i].score * 100, 2)}
+        if rerank_top:
+            row["Rerank Score (%)"] = round(relevance[i] * 100, 2) if i in relevance else None
+        if dedupe:
+            row["Near Duplicates"] = near_duplicates.get(ok[i].file_id, "")
+        ranked.append(row)
+    return ranked + failed
+
+
+def match_requisitions(files, jd_texts, jd_names=None, top_jobs=5, top_candidates=10, batch_size=64,
+                       max_workers=None, dedupe=False):
+    """Match every resume against every job description in one pass.
+
+    Both sides are encoded in batches through the embedding cache and the
+    resumes x requisitions cosine matrix is scored in blocks (see
+    ``similarity.topk_matrix``), so memory stays bounded for large pools.
+    Returns ``(by_candidate, by_requisition, failed)`` row lists: the best
+    ``top_jobs`` requisitions per resume, the best ``top_candidates`` resumes
+    per requisition, and unreadable files with an "Error" entry. With
+    ``dedupe`` near-duplicate uploads are folded into one representative, as
+    in ``rank_resumes``, and its rows list the others as "Near Duplicates".
+    """
+    jd_names = jd_names or [f"JD {i + 1}" for i in range(len(jd_texts))]
+    if not files or not jd_texts:
+        return [], [], []
+    with span("match_requisitions"):
+        records = list(iter_candidate_records(files, batch_size=batch_size, max_workers=max_workers, dedupe=dedupe))
+        ok = [r for r in records if r.ok]
+        failed = [{"Resume": r.name, "Error": r.error} for r in records if r.error]
+        near_duplicates = _near_duplicates(records)
+        count("resumes_ranked", len(ok))
+        if not ok:
+            return [], [], failed
+
+        resume_embs = normalize_rows(np.stack([r.embedding for r in ok]))
+        jd_embs = normalize_rows(embed(list(jd_texts), batch_size=batch_size))
+        (job_scores, job_idx), (cand_scores, cand_idx) = topk_matrix(
+            resume_embs, jd_embs, top_jobs, top_candidates
+        )
+
+    def duplicates(r):
+        return {"Near Duplicates": near_duplicates.get(ok[r].file_id, "")} if dedupe else {}
+
+    by_candidate = [
+        {"Resume": ok[r].name, "Rank": rank + 1, "Requisition": jd_names[j], "Match Score (%)": round(float(s) * 100, 2),
+         **duplicates(r)}
+        for r in range(len(ok))
+        for rank, (j, s) in enumerate(zip(job_idx[r], job_scores[r]))
+    ]
+    by_requisition = [
+        {"Requisition": jd_names[j], "Rank": rank + 1, "Resume": ok[r].name, "Match Score (%)": round(float(s) * 100, 2),
+         **duplicates(r)}
+        for j in range(len(jd_texts))
+        for rank, (r, s) in enumerate(zip(cand_idx[j], cand_scores[j]))
+    ]
+    return by_candidate, by_requisition, failed
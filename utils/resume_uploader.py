@@ -1,8 +1,11 @@
+from utils.text_extraction import extract_many, read_bytes
+
+
 def process_resumes(files):
-    resumes = []
-    for f in files:
-        resumes.append({
-            "name": f.name,
-            "content": f.read().decode('latin-1')
-        })
-    return resumes
+    """List of {"name", "content"} dicts, one per uploaded resume, with its extracted text.
+
+    Holds every resume's text at once; use ``candidates.iter_candidate_records``
+    to stream large uploads as compact records instead.
+    """
+    results = extract_many([f.name for f in files], [read_bytes(f) for f in files])
+    return [{"name": r.name, "content": r.text} for r in results]
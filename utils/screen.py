@@ -0,0 +1,267 @@
+"""Headless batch screening: score a folder of resumes against one or more job descriptions.
+
+    python -m utils.screen --resumes resumes/ --jd jd_data_analyst.txt --jd jd_ml.pdf \\
+        --output results.csv
+
+Resumes are parsed in a pool of worker processes with a bounded number of
+files in flight, embedded in batches, and each finished batch is appended to
+the CSV/JSONL output and recorded in a checkpoint file. Re-running the same
+command after an interruption skips resumes already in the checkpoint or the
+output. The checkpoint is keyed by the model and job descriptions, so a run
+with different ones must use a new output file.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.embedding import DEFAULT_MODEL_NAME, encode
+from utils.similarity import cosine_similarity
+from utils.text_extraction import ExtractionResult, count_extracted, extract_document
+
+SUPPORTED = (".pdf", ".docx", ".txt")
+KEY_PREFIX = "#run "
+
+
+def find_resumes(directory):
+    """All supported files under ``directory``, sorted for a stable order."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(SUPPORTED))
+    return sorted(paths)
+
+
+def read_manifest(path):
+    """Resume paths from a manifest: a CSV with a ``path`` column, or one path per line.
+
+    Relative paths are resolved against the manifest's directory.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            paths = [row["path"] for row in csv.DictReader(f) if row.get("path")]
+        else:
+            paths = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return [p if os.path.isabs(p) else os.path.join(base, p) for p in paths]
+
+
+def extract_path(path):
+    """Read and extract one file (runs in worker processes)."""
+    name = os.path.basename(path)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return ExtractionResult(name=name, error=f"Could not open file: {e}")
+    return extract_document(name, data, workers=1)
+
+
+def _collected(future):
+    """A worker's ExtractionResult, counted in this (the parent) process."""
+    result = future.result()
+    count_extracted([result])
+    return result
+
+
+def iter_extracted(paths, pool, max_in_flight):
+    """Yield ``(path, ExtractionResult)`` in input order, with at most ``max_in_flight`` files pending."""
+    pending = deque()
+    for path in paths:
+        pending.append((path, pool.submit(extract_path, path)))
+        if len(pending) >= max_in_flight:
+            done_path, future = pending.popleft()
+            yield done_path, _collected(future)
+    while pending:
+        done_path, future = pending.popleft()
+        yield done_path, _collected(future)
+
+
+def iter_batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _drop_partial_line(path):
+    """Truncate an interrupted trailing line so appended rows start on a line of their own."""
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+class ResultWriter:
+    """Appends one row per resume to a CSV or JSONL file, flushing after every row.
+
+    An existing CSV must have the same columns (the same job descriptions);
+    ``recorded`` holds the resumes already written to it.
+    """
+
+    def __init__(self, path, fmt, jd_names):
+        self.fmt = fmt
+        self.columns = ["resume", "best_jd", "best_score", "pages", "truncated", "extract_seconds", "error"] + jd_names
+        self.recorded = set()
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            _drop_partial_line(path)
+            self._read_existing(path)
+        self._file = open(path, "a", encoding="utf-8", newline="")
+        if fmt == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=self.columns)
+            if new_file:
+                self._csv.writeheader()
+
+    def _read_existing(self, path):
+        with open(path, encoding="utf-8", newline="") as f:
+            if self.fmt == "csv":
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if header is not None and header != self.columns:
+                    raise SystemExit(
+                        f"{path} has columns {header}, not {self.columns}; it was written for other job "
+                        "descriptions. Use a new --output."
+                    )
+                self.recorded = {row[0] for row in reader if row}
+            else:
+                for line in f:
+                    try:
+                        self.recorded.add(json.loads(line)["resume"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+
+    def write(self, row):
+        if self.fmt == "csv":
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(row) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def run_key(jd_texts, model_name):
+    """Identifies a screening configuration: the model and the (sorted) job description texts."""
+    h = hashlib.sha256(model_name.encode("utf-8"))
+    for text in sorted(jd_texts):
+        h.update(b"\0" + text.encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_checkpoint(path, key):
+    """Resume paths already screened; refuses a checkpoint written under a different ``run_key``."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f if line.strip()]
+    if lines and lines[0].startswith(KEY_PREFIX) and lines[0][len(KEY_PREFIX):] != key:
+        raise SystemExit(
+            f"Checkpoint {path} was written for other job descriptions or another model. "
+            "Use a new --output (or --checkpoint)."
+        )
+    return {line for line in lines if not line.startswith(KEY_PREFIX)}
+
+
+def screen(paths, jd_paths, output, fmt="csv", checkpoint=None, workers=None,
+           batch_size=64, model_name=DEFAULT_MODEL_NAME, log=sys.stderr):
+    """Score every resume in ``paths`` against every JD and stream rows to ``output``.
+
+    Returns the number of resumes processed in this run.
+    """
+    checkpoint = checkpoint or output + ".checkpoint"
+    jd_names = [os.path.basename(p) for p in jd_paths]
+    jd_texts = []
+    for p in jd_paths:
+        result = extract_path(p)
+        count_extracted([result])
+        if not result.ok or not result.text.strip():
+            raise SystemExit(f"Cannot read job description {p}: {result.error or 'no text found'}")
+        jd_texts.append(result.text)
+    key = run_key(jd_texts, model_name)
+    done = load_checkpoint(checkpoint, key)
+    jd_embs = np.atleast_2d(encode(jd_texts, model_name))
+    writer = ResultWriter(output, fmt, jd_names)
+    # Rows written just before an interruption may not have reached the checkpoint
+    done |= writer.recorded
+    todo = [p for p in paths if p not in done]
+
+    print(f"{len(todo)} resumes to screen ({len(paths) - len(todo)} already done) "
+          f"against {len(jd_paths)} job description(s).", file=log)
+
+    workers = workers or os.cpu_count() or 1
+    processed = 0
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool, open(checkpoint, "a", encoding="utf-8") as ckpt:
+            if ckpt.tell() == 0:
+                ckpt.write(KEY_PREFIX + key + "\n")
+            extracted = iter_extracted(todo, pool, max_in_flight=max(batch_size, 2 * workers))
+            for batch in iter_batches(extracted, batch_size):
+                readable = [i for i, (_, r) in enumerate(batch) if r.ok and r.text.strip()]
+                readable_set = set(readable)
+                scores = np.zeros((len(batch), len(jd_paths)), dtype=np.float32)
+                if readable:
+                    embs = np.atleast_2d(encode([batch[i][1].text for i in readable], model_name, batch_size=batch_size))
+                    scores[readable] = cosine_similarity(embs, jd_embs)
+
+                for i, (path, result) in enumerate(batch):
+                    row = {
+                        "resume": path,
+                        "pages": result.pages,
+                        "truncated": result.truncated,
+                        "extract_seconds": round(result.seconds, 4),
+                        "error": result.error or ("" if i in readable_set else "No text found"),
+                    }
+                    if i in readable_set:
+                        best = int(np.argmax(scores[i]))
+                        row["best_jd"] = jd_names[best]
+                        row["best_score"] = round(float(scores[i, best]) * 100, 2)
+                        row.update((name, round(float(s) * 100, 2)) for name, s in zip(jd_names, scores[i]))
+                    # The row is flushed before its checkpoint line
+                    writer.write(row)
+                    ckpt.write(path + "\n")
+                    ckpt.flush()
+
+                processed += len(batch)
+                rate = processed / max(time.perf_counter() - start, 1e-9)
+                print(f"  {processed}/{len(todo)} resumes ({rate:.1f}/s)", file=log)
+    finally:
+        writer.close()
+    return processed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-screen resumes against job descriptions.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--resumes", help="Directory of PDF/DOCX/TXT resumes (searched recursively)")
+    source.add_argument("--manifest", help="File listing resume paths (one per line, or CSV with a 'path' column)")
+    parser.add_argument("--jd", action="append", required=True, help="Job description file; repeat for several")
+    parser.add_argument("--output", required=True, help="Output .csv or .jsonl file (appended to)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Output format (default: from --output extension)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--workers", type=int, help="Extraction worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=64, help="Resumes embedded and written per batch")
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    args = parser.parse_args(argv)
+
+    paths = find_resumes(args.resumes) if args.resumes else read_manifest(args.manifest)
+    fmt = args.format or ("jsonl" if args.output.lower().endswith((".jsonl", ".json")) else "csv")
+    screen(paths, args.jd, args.output, fmt=fmt, checkpoint=args.checkpoint,
+           workers=args.workers, batch_size=args.batch_size, model_name=args.model)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
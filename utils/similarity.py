@@ -0,0 +1,109 @@
+import numpy as np
+
+from utils.metrics import span
+
+
+def normalize_rows(x):
+    """L2-normalize each row so inner products become cosine similarities."""
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+def cosine_similarity(a, b):
+    """Cosine similarity matrix between the rows of ``a`` and ``b`` (1-D inputs become one row)."""
+    with span("similarity"):
+        return normalize_rows(np.atleast_2d(a)) @ normalize_rows(np.atleast_2d(b)).T
+
+
+def _merge_topk(scores, indices, k):
+    """Keep the k best columns of each row of (scores, indices)."""
+    if scores.shape[1] <= k:
+        return scores, indices
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(scores, part, axis=1), np.take_along_axis(indices, part, axis=1)
+
+
+def topk_blocked(queries, matrix, k, block_size=65536, row_ids=None, scales=None):
+    """Top-k inner products of each query against ``matrix`` rows.
+
+    ``matrix`` (which may be a memmap) is scanned in blocks of ``block_size``
+    rows so memory stays bounded by ``len(queries) * block_size`` scores.
+    ``row_ids`` optionally restricts the scan to those rows of ``matrix``.
+    ``scales`` optionally multiplies each row's scores (per-row quantization
+    scales of an integer ``matrix``). Returns ``(scores, indices)`` arrays of shape (n_queries, <=k), best first.
+    """
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    if row_ids is not None:
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+    n = matrix.shape[0] if row_ids is None else len(row_ids)
+    best_scores = np.empty((queries.shape[0], 0), dtype=np.float32)
+    best_idx = np.empty((queries.shape[0], 0), dtype=np.int64)
+    if n == 0 or k <= 0:
+        return best_scores, best_idx
+
+    with span("topk_search"):
+        for start in range(0, n, block_size):
+            if row_ids is None:
+                rows = np.arange(start, min(start + block_size, n))
+                block = np.asarray(matrix[start:start + block_size], dtype=np.float32)
+            else:
+                rows = row_ids[start:start + block_size]
+                block = np.asarray(matrix[rows], dtype=np.float32)
+            scores = queries @ block.T
+            if scales is not None:
+                scores *= scales[rows]
+            idx = np.broadcast_to(rows, scores.shape)
+            scores, idx = _merge_topk(scores, idx, k)
+            best_scores, best_idx = _merge_topk(
+                np.concatenate([best_scores, scores], axis=1),
+                np.concatenate([best_idx, idx], axis=1),
+                k,
+            )
+
+    return _sort_topk(best_scores, best_idx)
+
+
+def _empty_topk(n):
+    return np.empty((n, 0), dtype=np.float32), np.empty((n, 0), dtype=np.int64)
+
+
+def _sort_topk(scores, indices):
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(indices, order, axis=1)
+
+
+def topk_matrix(a, b, k_rows, k_cols, block_size=4096):
+    """Top matches in both directions of the ``a @ b.T`` score matrix, computed blockwise.
+
+    Only a ``block_size`` x ``block_size`` tile of scores exists at a time.
+    Returns ``((row_scores, row_idx), (col_scores, col_idx))``: the best
+    ``k_rows`` rows of ``b`` for each row of ``a`` and the best ``k_cols`` rows
+    of ``a`` for each row of ``b``, best first. Normalize rows first for cosine.
+    """
+    a = np.atleast_2d(np.asarray(a, dtype=np.float32))
+    b = np.atleast_2d(np.asarray(b, dtype=np.float32))
+    col_starts = range(0, len(b), block_size)
+    col_best = {j: _empty_topk(len(b[j:j + block_size])) for j in col_starts}
+    row_best = []
+
+    with span("topk_matrix"):
+        for i in range(0, len(a), block_size):
+            a_block = a[i:i + block_size]
+            best = _empty_topk(len(a_block))
+            for j in col_starts:
+                scores = a_block @ b[j:j + block_size].T
+                cols = np.broadcast_to(np.arange(j, j + scores.shape[1]), scores.shape)
+                best = _merge_topk(
+                    np.concatenate([best[0], scores], axis=1), np.concatenate([best[1], cols], axis=1), k_rows
+                )
+                rows = np.broadcast_to(np.arange(i, i + scores.shape[0]), scores.T.shape)
+                col_scores, col_idx = col_best[j]
+                col_best[j] = _merge_topk(
+                    np.concatenate([col_scores, scores.T], axis=1), np.concatenate([col_idx, rows], axis=1), k_cols
+                )
+            row_best.append(best)
+
+    rows = [np.concatenate(parts) for parts in zip(*row_best)] if row_best else _empty_topk(0)
+    cols = [np.concatenate(parts) for parts in zip(*col_best.values())] if col_best else _empty_topk(0)
+    return _sort_topk(*rows), _sort_topk(*cols)
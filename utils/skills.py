@@ -0,0 +1,159 @@
+"""Skill mention extraction with a precompiled Aho-Corasick automaton.
+
+The skills lexicon (data/skills_lexicon.txt) and its synonyms
+(data/skills_synonyms.txt) are tokenized and compiled once per process into
+an automaton over word tokens, so every skill and alias, including
+multi-word ones like "machine learning" or "power bi", is found in a single
+linear pass over a document's tokens (shared with the rest of the request
+through ``tokenize``) and reported under its canonical name.
+"""
+import os
+import threading
+from collections import Counter, deque
+
+from utils.token_vocab import DEFAULT_LEXICON, read_lexicon
+from utils.tokenization import WORD_RE, tokenize
+
+DEFAULT_SYNONYMS = os.environ.get(
+    "RESUME_SCREENER_SKILLS_SYNONYMS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "skills_synonyms.txt"),
+)
+
+
+def skill_tokens(text):
+    """Lower-cased skill tokens of a lexicon phrase, split like ``tokenize`` splits documents.
+
+    Only used to compile the automaton; phrases are not memoized, so they do
+    not crowd documents out of the ``tokenize`` memo.
+    """
+    return WORD_RE.findall(text.lower())
+
+
+def read_synonyms(path):
+    """Parse ``canonical: alias, alias`` lines into ({canonical: [aliases]}, {case-sensitive canonicals})."""
+    synonyms, strict = {}, set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            canonical, _, aliases = line.partition(":")
+            canonical = canonical.strip().lower()
+            if canonical.startswith("!"):
+                canonical = canonical[1:]
+                strict.add(canonical)
+            synonyms.setdefault(canonical, []).extend(a.strip().lower() for a in aliases.split(",") if a.strip())
+    return synonyms, strict
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over word tokens mapping skill phrases to canonical names.
+
+    ``phrases`` maps each surface form (e.g. "sklearn") to its canonical
+    skill (e.g. "scikit-learn"). Canonical names in ``strict`` only match
+    when the source text capitalizes them.
+    """
+
+    def __init__(self, phrases, strict=()):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for phrase, canonical in phrases.items():
+            tokens = skill_tokens(phrase)
+            if tokens:
+                self._add(tokens, canonical, canonical in strict and phrase == canonical)
+        self._link()
+        self.skills = sorted(set(phrases.values()))
+
+    def _add(self, tokens, canonical, strict):
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][token] = nxt
+            state = nxt
+        self._out[state].append((len(tokens), canonical, strict))
+
+    def _link(self):
+        """Breadth-first failure links; each state's output includes its fallbacks'."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(token, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        """Yield ``(canonical, start, end)`` token spans for every skill mention.
+
+        ``text`` is a string or a TokenizedDocument; strings go through the
+        memoized ``tokenize``.
+        """
+        doc = tokenize(text) if isinstance(text, str) else text
+        lowercase = doc.lowercase
+        last_end = {}  # canonical -> end of its previous mention, so "REST APIs" counts once
+        state = 0
+        for i, token in enumerate(doc.tokens()):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, canonical, strict in self._out[state]:
+                start = i - length + 1
+                if start < last_end.get(canonical, 0):
+                    continue
+                if strict and lowercase[start:i + 1].all():
+                    continue
+                last_end[canonical] = i + 1
+                yield canonical, start, i + 1
+
+    def count(self, text):
+        """Counter of canonical skill mentions in ``text`` (a string or TokenizedDocument)."""
+        return Counter(canonical for canonical, _, _ in self.iter_matches(text))
+
+    def find(self, text):
+        """Canonical skills mentioned in ``text`` (a string or TokenizedDocument), in order of first mention."""
+        return list(dict.fromkeys(canonical for canonical, _, _ in self.iter_matches(text)))
+
+
+def load_matcher(lexicon=DEFAULT_LEXICON, synonyms=DEFAULT_SYNONYMS):
+    """Compile a SkillMatcher from a lexicon file and an optional synonyms file."""
+    phrases = {skill: skill for skill in read_lexicon(lexicon)}
+    strict = set()
+    if synonyms and os.path.exists(synonyms):
+        aliases, strict = read_synonyms(synonyms)
+        for canonical, forms in aliases.items():
+            phrases.setdefault(canonical, canonical)
+            for form in forms:
+                phrases[form] = canonical
+    return SkillMatcher(phrases, strict)
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """Process-wide SkillMatcher for the configured lexicon and synonyms."""
+    global _matcher
+    with _matcher_lock:
+        if _matcher is None:
+            _matcher = load_matcher()
+        return _matcher
+
+
+def compare_skills(resume_text, jd_text):
+    """Return (matched, missing): the job description's skills found / not found in the resume."""
+    matcher = get_skill_matcher()
+    resume_skills = set(matcher.find(resume_text))
+    jd_skills = matcher.find(jd_text)
+    matched = [s for s in jd_skills if s in resume_skills]
+    missing = [s for s in jd_skills if s not in resume_skills]
+    return matched, missing
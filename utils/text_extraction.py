@@ -1,30 +1,288 @@
+import io
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
 from PyPDF2 import PdfReader
 import docx2txt
 
+from utils.extraction_cache import content_key, get_extraction_cache
+from utils.metrics import count, span
+
+# Hard limits so oversized uploads (e.g. 80-page portfolios) cannot stall a worker
+MAX_PAGES = int(os.environ.get("RESUME_SCREENER_MAX_PAGES", "30"))
+MAX_BYTES = int(os.environ.get("RESUME_SCREENER_MAX_BYTES", str(10 * 1024 * 1024)))
+# PDFs with at least this many pages are split across worker processes
+PARALLEL_PAGES = int(os.environ.get("RESUME_SCREENER_PARALLEL_PAGES", "16"))
+PAGES_PER_TASK = 4
+
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_HORIZONTAL_SPACE = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES = re.compile(r"\n\s*\n\s*\n+")
+
+
+def normalize_extracted_text(text):
+    """Drop control characters and collapse runs of spaces and blank lines, keeping line breaks."""
+    text = _CONTROL_CHARS.sub("", text.replace("\r\n", "\n").replace("\r", "\n"))
+    text = _HORIZONTAL_SPACE.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+@dataclass
+class ExtractionResult:
+    """Outcome of extracting one document.
+
+    ``seconds`` is the time spent extracting in this call: 0 for cache hits,
+    which have ``cached`` set.
+    """
+    name: str
+    text: str = ""
+    pages: int = 0
+    truncated: bool = False
+    seconds: float = 0.0
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def read_bytes(file):
+    """Return the raw bytes of an uploaded or opened file without consuming it."""
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    data = file.read()
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return data
+
+
+_worker_pdf = None
+
+
+def _open_worker_pdf(data):
+    """Pool initializer: parse the PDF once per worker process."""
+    global _worker_pdf
+    _worker_pdf = PdfReader(io.BytesIO(data))
+
+
+def _extract_page_range(start, stop):
+    """Extract pages [start, stop) of the worker's PDF (runs in worker processes)."""
+    return [_worker_pdf.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def iter_pdf_pages(data, max_pages=MAX_PAGES, workers=None, pdf=None):
+    """Yield the text of each PDF page, in order, as it is parsed.
+
+    At most ``max_pages`` pages are read. Documents with ``PARALLEL_PAGES``
+    or more pages are fanned out across ``workers`` processes in small page
+    ranges, each worker parsing the document once; results are still
+    yielded in page order. An already opened ``PdfReader`` for ``data`` may
+    be passed to avoid parsing it twice.
+    """
+    pdf = pdf or PdfReader(io.BytesIO(data))
+    n = min(len(pdf.pages), max_pages)
+    workers = workers if workers is not None else min(os.cpu_count() or 1, 4)
+
+    if n < PARALLEL_PAGES or workers < 2:
+        for i in range(n):
+            yield pdf.pages[i].extract_text() or ""
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_open_worker_pdf, initargs=(data,)) as pool:
+        futures = [
+            pool.submit(_extract_page_range, start, min(start + PAGES_PER_TASK, n))
+            for start in range(0, n, PAGES_PER_TASK)
+        ]
+        for future in futures:
+            yield from future.result()
+
+
+def iter_text_chunks(pages, chunk_chars=4000):
+    """Regroup an iterable of page texts into chunks of roughly ``chunk_chars``."""
+    buffer = []
+    size = 0
+    for page in pages:
+        buffer.append(page)
+        size += len(page)
+        if size >= chunk_chars:
+            yield "\n".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "\n".join(buffer)
+
+
+def iter_document_pages(name, data, max_pages=MAX_PAGES, workers=None, pdf=None):
+    """Yield page texts for a PDF, or the whole text of a DOCX/TXT as one page."""
+    lower = name.lower()
+    if lower.endswith(".pdf"):
+        yield from iter_pdf_pages(data, max_pages=max_pages, workers=workers, pdf=pdf)
+    elif lower.endswith(".docx"):
+        yield docx2txt.process(io.BytesIO(data))
+    elif lower.endswith(".txt"):
+        yield data.decode("utf-8", errors="ignore")
+    else:
+        raise ValueError(f"Unsupported file type: {name}")
+
+
+def extract_document(name, data, max_pages=MAX_PAGES, max_bytes=MAX_BYTES, workers=None):
+    """Extract a document's text into an ExtractionResult; never raises.
+
+    Files larger than ``max_bytes`` are rejected, and PDFs are cut off after
+    ``max_pages`` pages (``truncated`` is set).
+    """
+    start = time.perf_counter()
+    result = ExtractionResult(name=name)
+    if len(data) > max_bytes:
+        result.error = f"File is {len(data) / 1e6:.1f} MB; the limit is {max_bytes / 1e6:.1f} MB"
+    else:
+        pages = []
+        try:
+            pdf = PdfReader(io.BytesIO(data)) if name.lower().endswith(".pdf") else None
+            for page in iter_document_pages(name, data, max_pages=max_pages, workers=workers, pdf=pdf):
+                pages.append(page)
+            result.truncated = pdf is not None and len(pdf.pages) > max_pages
+        except Exception as e:
+            result.error = f"Could not read file: {e}"
+        result.text = normalize_extracted_text("\n".join(pages))
+        result.pages = len(pages)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def count_extracted(results):
+    """Record freshly extracted results in the metrics.
+
+    Called where the results arrive in the main process, since counters
+    incremented inside worker processes are lost.
+    """
+    count("documents_extracted", len(results))
+    count("extraction_error", sum(1 for r in results if r.error))
+
+
+def extraction_key(name, data, max_pages=MAX_PAGES, max_bytes=MAX_BYTES):
+    return content_key(name, data, max_pages, max_bytes)
+
+
+def _cached_result(cache, key):
+    """Cache hit marked as such (no extraction time spent), or None."""
+    result = cache.get(key, ExtractionResult)
+    if result is not None:
+        result.seconds = 0.0
+        result.cached = True
+    return result
+
+
+def extract_cached(name, data, max_pages=MAX_PAGES, max_bytes=MAX_BYTES, workers=None):
+    """extract_document() through the process-wide content-hash cache.
+
+    The same bytes are parsed at most once per process (or once ever, with
+    the disk tier enabled), across reruns, pages and users. Failed
+    extractions are not cached, so they are retried on the next call.
+    """
+    cache = get_extraction_cache()
+    key = extraction_key(name, data, max_pages, max_bytes)
+    result = _cached_result(cache, key)
+    count("extraction_cache_hit" if result is not None else "extraction_cache_miss")
+    if result is None:
+        with span("extract"):
+            result = extract_document(name, data, max_pages=max_pages, max_bytes=max_bytes, workers=workers)
+        count_extracted([result])
+        cache.put(key, result)
+    result.name = name
+    return result
+
+
+def extract_file(file, **kwargs):
+    """Cached ExtractionResult for an uploaded/opened file object with a ``name``."""
+    return extract_cached(file.name, read_bytes(file), **kwargs)
+
+
+def read_upload(file, log=None):
+    """Text of an optional upload ("" when there is none).
+
+    Errors and truncation are reported through ``log.error`` / ``log.warning``
+    (``st`` on a page, or a ``logging.Logger``).
+    """
+    if not file:
+        return ""
+    result = extract_file(file)
+    if log is not None:
+        if result.error:
+            log.error(f"❌ {result.error}")
+        elif result.truncated:
+            log.warning(f"⚠️ Only the first {result.pages} pages of {result.name} were read.")
+    return result.text
+
+
+def _extract_serial(name, data):
+    """Extract one file without page fan-out (picklable entry point for per-file worker pools)."""
+    return extract_document(name, data, workers=1)
+
+
+def extract_many(names, payloads, max_workers=None, pool=None):
+    """Extract many files, one file per worker process, skipping cached ones.
+
+    ``pool`` is an existing ProcessPoolExecutor to reuse across calls;
+    otherwise one is started for this call when there are several misses.
+    Returns an ExtractionResult per payload, in order.
+    """
+    cache = get_extraction_cache()
+    keys = [extraction_key(n, p) for n, p in zip(names, payloads)]
+    results = [_cached_result(cache, k) for k in keys]
+    todo = [i for i, r in enumerate(results) if r is None]
+    count("extraction_cache_hit", len(results) - len(todo))
+    count("extraction_cache_miss", len(todo))
+
+    with span("extract_batch"):
+        fresh = _extract_all(names, payloads, todo, max_workers, pool)
+    count_extracted(fresh)
+    for i, result in zip(todo, fresh):
+        cache.put(keys[i], result)
+        results[i] = result
+
+    for name, result in zip(names, results):
+        result.name = name
+    return results
+
+
+def _extract_all(names, payloads, todo, max_workers, pool=None):
+    """Extract the files at indices ``todo``, in a process pool when there are several."""
+    if len(todo) < 2:
+        return [_extract_serial(names[i], payloads[i]) for i in todo]
+    if pool is not None:
+        return list(pool.map(_extract_serial, [names[i] for i in todo], [payloads[i] for i in todo]))
+    workers = max_workers or min(len(todo), os.cpu_count() or 1)
+    chunksize = max(1, len(todo) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(
+            _extract_serial, [names[i] for i in todo], [payloads[i] for i in todo], chunksize=chunksize
+        ))
+
+
+def _text_or_error(result, kind):
+    """The extracted text, or the legacy "[Error reading ...]" string the helpers below returned on failure."""
+    return f"[Error reading {kind}: {result.error}]" if result.error else result.text
+
 def extract_text_from_pdf(file):
     """Extract text from a PDF file."""
-    try:
-        pdf = PdfReader(file)
-        return " ".join(page.extract_text() or "" for page in pdf.pages)
-    except Exception as e:
-        return f"[Error reading PDF: {e}]"
+    return _text_or_error(extract_cached("document.pdf", read_bytes(file)), "PDF")
 
 def extract_text_from_docx(file):
     """Extract text from a DOCX file."""
-    try:
-        return docx2txt.process(file)
-    except Exception as e:
-        return f"[Error reading DOCX: {e}]"
+    return _text_or_error(extract_cached("document.docx", read_bytes(file)), "DOCX")
 
 def get_text(file):
     """Universal extractor for PDF/DOCX/TXT files."""
     if not file:
         return ""
-    name = file.name.lower()
-    if name.endswith(".pdf"):
-        return extract_text_from_pdf(file)
-    elif name.endswith(".docx"):
-        return extract_text_from_docx(file)
-    elif name.endswith(".txt"):
-        return file.read().decode("utf-8", errors="ignore")
-    return ""
+    result = extract_file(file)
+    kind = {".pdf": "PDF", ".docx": "DOCX"}.get(os.path.splitext(file.name.lower())[1])
+    return _text_or_error(result, kind) if kind else result.text
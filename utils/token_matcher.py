@@ -0,0 +1,40 @@
+import numpy as np
+
+from utils.similarity import cosine_similarity
+
+
+def dedupe_tokens(tokens):
+    """Unique tokens in first-seen order."""
+    return list(dict.fromkeys(tokens))
+
+
+def match_token_embeddings(source_emb, target_emb, threshold):
+    """Best target match for every source row, as whole-array ops.
+
+    Returns ``(mask, best_index, best_score)`` arrays of length
+    ``len(source_emb)``; ``mask`` is True where the best score exceeds
+    ``threshold``.
+    """
+    sim = cosine_similarity(source_emb, target_emb)
+    best_index = np.argmax(sim, axis=1)
+    best_score = np.take_along_axis(sim, best_index[:, None], axis=1)[:, 0]
+    return best_score > threshold, best_index, best_score
+
+
+def match_tokens(source_tokens, target_tokens, encode, threshold=0.7):
+    """Split source tokens into those with a semantic match among target tokens and the rest.
+
+    Both sides are deduplicated before ``encode`` (e.g. ``encode_tokens``) is
+    called once per side. Returns ``(matched, missing)`` lists of source
+    tokens in first-seen order.
+    """
+    source = dedupe_tokens(source_tokens)
+    target = dedupe_tokens(target_tokens)
+    if not source or not target:
+        return [], source
+
+    mask, _, _ = match_token_embeddings(encode(source), encode(target), threshold)
+    mask = mask.tolist()
+    matched = [t for t, hit in zip(source, mask) if hit]
+    missing = [t for t, hit in zip(source, mask) if not hit]
+    return matched, missing
@@ -0,0 +1,229 @@
+"""Process-wide token -> embedding vocabulary for word-level semantic matching.
+
+    python -m utils.token_vocab --lexicon data/skills_lexicon.txt
+
+prewarms the vocabulary from a lexicon and saves it as an ``.npy``/``.json``
+pair that later processes memory-map on startup.
+"""
+import argparse
+import atexit
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.embedding_cache import DEFAULT_CACHE_DIR
+from utils.metrics import count
+
+DEFAULT_VOCAB_DIR = os.path.join(DEFAULT_CACHE_DIR, "vocab")
+DEFAULT_LEXICON = os.environ.get(
+    "RESUME_SCREENER_SKILLS_LEXICON",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "skills_lexicon.txt"),
+)
+DEFAULT_MAX_TOKENS = int(os.environ.get("RESUME_SCREENER_TOKEN_VOCAB_SIZE", "100000"))
+# Rows always left for tokens first seen in this process, even when the saved vocabulary is full
+MIN_NEW_ROWS = 4096
+
+
+def read_lexicon(path):
+    """Lower-cased lexicon entries, one per line; blank and ``#`` comment lines skipped."""
+    with open(path, encoding="utf-8") as f:
+        entries = (line.strip().lower() for line in f)
+        return [e for e in entries if e and not e.startswith("#")]
+
+
+class TokenVocabulary:
+    """Maps tokens to embedding rows, encoding each token only once per process.
+
+    Rows loaded from disk stay in a read-only memmap and are never evicted.
+    Tokens first seen in this process go to an in-memory array holding up to
+    ``max_tokens`` rows in total (at least ``MIN_NEW_ROWS``); once it is full
+    the least recently used new token is overwritten, so free text (names,
+    typos, numbers) cannot grow the vocabulary without bound. ``save`` keeps
+    the loaded rows plus the most recently used new ones, up to ``max_tokens``.
+    """
+
+    def __init__(self, model_name, base_tokens=(), base_vectors=None, max_tokens=DEFAULT_MAX_TOKENS):
+        self.model_name = model_name
+        self.max_tokens = max_tokens
+        self._base_tokens = list(base_tokens)
+        self.index = {t: i for i, t in enumerate(self._base_tokens)}
+        self._base = base_vectors
+        self._n_base = len(self._base_tokens)
+        self._capacity = max(max_tokens - self._n_base, MIN_NEW_ROWS)
+        self._extra = None
+        self._n_extra = 0
+        self._recent = OrderedDict()  # new token -> row of _extra, least recently used first
+        self._lock = threading.Lock()
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, token):
+        return token in self.index
+
+    def _reserve(self, n, dim):
+        """Make room for ``n`` more rows in the in-memory array, growing it by doubling up to capacity."""
+        needed = min(self._n_extra + n, self._capacity)
+        if self._extra is None:
+            self._extra = np.empty((min(max(1024, needed), self._capacity), dim), dtype=np.float32)
+        elif needed > len(self._extra):
+            grown = np.empty((min(max(needed, 2 * len(self._extra)), self._capacity), dim), dtype=np.float32)
+            grown[:self._n_extra] = self._extra[:self._n_extra]
+            self._extra = grown
+
+    def _append(self, tokens, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self._reserve(len(vectors), vectors.shape[1])
+        evicted = 0
+        for t, v in zip(tokens, vectors):
+            if self._n_extra < self._capacity:
+                row = self._n_extra
+                self._n_extra += 1
+            else:
+                old, row = self._recent.popitem(last=False)
+                del self.index[old]
+                evicted += 1
+            self._extra[row] = v
+            self._recent[t] = row
+            self.index[t] = self._n_base + row
+        count("token_vocab_evicted", evicted)
+        self.dirty = True
+
+    def _gather(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        dim = (self._base if self._base is not None else self._extra).shape[1]
+        out = np.empty((len(rows), dim), dtype=np.float32)
+        in_base = rows < self._n_base
+        if in_base.any():
+            out[in_base] = self._base[rows[in_base]]
+        if (~in_base).any():
+            out[~in_base] = self._extra[rows[~in_base] - self._n_base]
+        return out
+
+    def embed(self, tokens, encoder):
+        """Return an (n, dim) float32 array of embeddings for ``tokens``.
+
+        Unseen tokens are sent to ``encoder`` (e.g. ``model.encode``) in a
+        single batch; everything else is an array gather.
+        """
+        tokens = list(tokens)
+        if not tokens:
+            return np.zeros((0, 0), dtype=np.float32)
+        unique = list(dict.fromkeys(tokens))
+        fresh = {}
+        while True:
+            with self._lock:
+                unseen = [t for t in unique if t not in self.index and t not in fresh]
+                if not unseen:
+                    return self._lookup(tokens, fresh)
+            if not fresh:
+                # Both over the distinct tokens of this call
+                count("token_vocab_hit", len(unique) - len(unseen))
+                count("token_vocab_miss", len(unseen))
+            # Encode outside the lock; loop in case another thread evicted a hit meanwhile
+            fresh.update(zip(unseen, np.asarray(encoder(unseen), dtype=np.float32)))
+
+    def _lookup(self, tokens, fresh):
+        """Embeddings of ``tokens`` from stored rows or the just-encoded ``fresh``, which are then stored."""
+        for t in tokens:
+            if t in self._recent:
+                self._recent.move_to_end(t)
+        stored = [i for i, t in enumerate(tokens) if t not in fresh]
+        # Gather before appending: the append may evict rows once the array is full
+        known = self._gather([self.index[tokens[i]] for i in stored]) if stored else None
+        dim = known.shape[1] if known is not None else len(next(iter(fresh.values())))
+        out = np.empty((len(tokens), dim), dtype=np.float32)
+        if stored:
+            out[stored] = known
+        for i, t in enumerate(tokens):
+            if t in fresh:
+                out[i] = fresh[t]
+        new = [t for t in fresh if t not in self.index]
+        if new:
+            self._append(new, np.stack([fresh[t] for t in new]))
+        return out
+
+    def prewarm(self, path, encoder):
+        """Embed every entry of a lexicon file."""
+        return len(self.embed(read_lexicon(path), encoder))
+
+    def save(self, prefix):
+        """Write ``<prefix>.npy`` (vectors) and ``<prefix>.json`` (tokens)."""
+        with self._lock:
+            if not self.index:
+                return
+            recent = list(self._recent)
+            room = max(self.max_tokens - self._n_base, 0)
+            tokens = self._base_tokens + recent[max(len(recent) - room, 0):]
+            vectors = self._gather([self.index[t] for t in tokens])
+        os.makedirs(os.path.dirname(prefix) or ".", exist_ok=True)
+        with open(prefix + ".npy.tmp", "wb") as f:
+            np.save(f, vectors)
+        os.replace(prefix + ".npy.tmp", prefix + ".npy")
+        with open(prefix + ".json.tmp", "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "tokens": tokens}, f)
+        os.replace(prefix + ".json.tmp", prefix + ".json")
+        self.dirty = False
+
+    @classmethod
+    def load(cls, prefix, model_name):
+        """Memory-map a saved vocabulary; returns an empty one if none is usable."""
+        try:
+            with open(prefix + ".json", encoding="utf-8") as f:
+                meta = json.load(f)
+            vectors = np.load(prefix + ".npy", mmap_mode="r")
+        except (OSError, ValueError):
+            return cls(model_name)
+        if meta.get("model") != model_name or len(vectors) != len(meta["tokens"]):
+            return cls(model_name)
+        return cls(model_name, meta["tokens"], vectors)
+
+
+def vocab_prefix(model_name):
+    return os.path.join(DEFAULT_VOCAB_DIR, re.sub(r"[^A-Za-z0-9._-]", "_", model_name))
+
+
+_vocabularies = {}
+_vocabularies_lock = threading.Lock()
+
+
+def get_vocabulary(model_name):
+    """Process-wide TokenVocabulary for ``model_name``, loaded from disk on first use."""
+    with _vocabularies_lock:
+        if model_name not in _vocabularies:
+            _vocabularies[model_name] = TokenVocabulary.load(vocab_prefix(model_name), model_name)
+        return _vocabularies[model_name]
+
+
+@atexit.register
+def _save_vocabularies():
+    for name, vocab in list(_vocabularies.items()):
+        if vocab.dirty:
+            try:
+                vocab.save(vocab_prefix(name))
+            except OSError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prewarm and save the token embedding vocabulary.")
+    parser.add_argument("--lexicon", default=DEFAULT_LEXICON)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(args.model)
+    vocab = get_vocabulary(args.model)
+    vocab.prewarm(args.lexicon, lambda batch: model.encode(batch, batch_size=256))
+    vocab.save(vocab_prefix(args.model))
+    print(f"Saved {len(vocab)} token embeddings to {vocab_prefix(args.model)}.npy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Shared text normalization and tokenization.
+
+Every page and generator tokenizes through ``tokenize``, which splits a
+document with one precompiled pattern, lower-cases the tokens, numbers them
+within the document and memoizes the result by a hash of the text, so a
+document is normalized once per request however many features (keywords,
+skill matching, deduplication, analytics) read it. Token ids are local to
+each document, so memory is bounded by the memo size rather than by every
+token ever uploaded.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.metrics import count
+
+# Word tokens keep the characters that matter in skill names (c++, c#, node.js)
+WORD_RE = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*", re.IGNORECASE)
+
+STOP_WORDS = frozenset(
+    "the and for with that this are was were to of in on as at by be an it or from".split()
+)
+MEMO_SIZE = 256
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+class TokenizedDocument:
+    """A document as lower-cased tokens numbered within the document.
+
+    ``vocab`` lists each distinct token once, in order of first occurrence;
+    ``ids`` is the token sequence as indices into ``vocab``, ``counts`` the
+    occurrences of each ``vocab`` entry and ``lowercase`` whether each token
+    was written entirely in lower case in the source text.
+    """
+
+    __slots__ = ("vocab", "ids", "counts", "lowercase")
+
+    def __init__(self, raw_tokens):
+        index = {}
+        lowered = [t.lower() for t in raw_tokens]
+        self.ids = np.array([index.setdefault(t, len(index)) for t in lowered], dtype=np.int32)
+        self.vocab = list(index)
+        self.counts = np.bincount(self.ids, minlength=len(self.vocab))
+        self.lowercase = np.array([t.islower() for t in raw_tokens], dtype=bool)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def tokens(self):
+        """The token sequence as strings."""
+        vocab = self.vocab
+        return [vocab[i] for i in self.ids]
+
+    def unique_tokens(self):
+        """Distinct tokens in order of first occurrence."""
+        return list(self.vocab)
+
+    def most_common(self, n=None):
+        """``(token, count)`` pairs, most frequent first (ties in order of first occurrence)."""
+        order = np.argsort(-self.counts, kind="stable")[:n]
+        return [(self.vocab[i], int(self.counts[i])) for i in order]
+
+    def keywords(self, min_length=3):
+        """Distinct tokens of at least ``min_length`` characters that are not stop words."""
+        return [t for t in self.vocab if len(t) >= min_length and t not in STOP_WORDS]
+
+
+def tokenize(text):
+    """Memoized TokenizedDocument for ``text`` (keyed by a hash of the text)."""
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    with _memo_lock:
+        doc = _memo.get(key)
+        if doc is not None:
+            _memo.move_to_end(key)
+    count("tokenize_cache_hit" if doc is not None else "tokenize_cache_miss")
+    if doc is None:
+        doc = TokenizedDocument(WORD_RE.findall(text))
+        with _memo_lock:
+            _memo[key] = doc
+            while len(_memo) > MEMO_SIZE:
+                _memo.popitem(last=False)
+    return doc